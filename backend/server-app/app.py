@@ -3,11 +3,17 @@ from flask_cors import CORS
 from extensions import db, migrate, jwt, mail
 from routes.auth_routes import auth_bp
 from routes.user_routes import user_bp
+from utils.token_revocation import is_token_revoked
+from utils.role_version import is_role_stale
+from utils.compression import init_compression
+from repo.user_repo import UserRepository
+from utils.json_provider import init_json
 
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object('config.Config')
+    init_json(app)
 
     CORS(app, supports_credentials=True, origins=["http://localhost", "http://127.0.0.1", "http://localhost:5173" ],)
     
@@ -17,10 +23,17 @@ def create_app():
     mail.init_app(app)
     migrate.init_app(app, db)
 
+    # Logged-out tokens and tokens issued before a role change/deletion (also covers admin_required)
+    @jwt.token_in_blocklist_loader
+    def check_if_token_revoked(jwt_header, jwt_payload):
+        return is_token_revoked(jwt_payload["jti"], UserRepository.is_token_blocklisted) or is_role_stale(jwt_payload)
+
     # Register blueprints with prefixes
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(user_bp, url_prefix='/api/users')
 
+    init_compression(app)
+
 
     
 
@@ -0,0 +1,40 @@
+"""
+Login hashing throughput at the configured PASSWORD_HASH_METHOD.
+
+    python benchmarks/password_hash_bench.py [logins]
+
+Runs `logins` password verifications through utils.password_hasher's pool
+and reports logins/sec overall and per core.
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from config import Config
+from utils.password_hasher import hash_password, verify_password
+
+
+def main():
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    workers = Config.PASSWORD_HASH_WORKERS
+    stored = hash_password("correct horse battery staple")
+
+    # Callers are request threads; the hasher pool bounds the actual hashing concurrency
+    with ThreadPoolExecutor(max_workers=workers * 4) as callers:
+        start = time.perf_counter()
+        results = list(callers.map(lambda _: verify_password(stored, "correct horse battery staple"), range(logins)))
+        elapsed = time.perf_counter() - start
+
+    assert all(results)
+    per_sec = logins / elapsed
+    print(f"method:          {Config.PASSWORD_HASH_METHOD} ({Config.PASSWORD_HASH_EXECUTOR} pool, {workers} workers)")
+    print(f"logins:          {logins} in {elapsed:.2f}s")
+    print(f"logins/sec:      {per_sec:.1f}")
+    print(f"logins/sec/core: {per_sec / min(workers, os.cpu_count() or 1):.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,10 +15,30 @@ class Config:
     JWT_COOKIE_SECURE = False        # Set to True in production (requires HTTPS)
     JWT_COOKIE_SAMESITE = 'Lax'
 
+    # Logout revocation list in Redis. The optional in-process Bloom filter skips the Redis
+    # lookup for tokens that were never revoked; tokens revoked by another process are only
+    # seen after the next refresh, so keep the refresh interval short.
+    JWT_REVOCATION_BLOOM = os.getenv("JWT_REVOCATION_BLOOM", "false").lower() == "true"
+    JWT_REVOCATION_BLOOM_REFRESH_SECONDS = int(os.getenv("JWT_REVOCATION_BLOOM_REFRESH_SECONDS", 5))
+    JWT_REVOCATION_BLOOM_CAPACITY = 100_000
+    JWT_REVOCATION_BLOOM_ERROR_RATE = 0.01
+    # How long a user's role version is cached in-process before asking Redis again
+    ROLE_VERSION_CACHE_SECONDS = float(os.getenv("ROLE_VERSION_CACHE_SECONDS", 2))
+
 
     REDIS_HOST = os.getenv("REDIS_HOST", "redis")
     REDIS_PORT = os.getenv("REDIS_PORT", 6379)
 
+    # GET /api/users/profile cache (seconds): fresh in Redis, then served stale while refreshing;
+    # the in-process L1 copy is kept short because other workers can't invalidate it
+    PROFILE_CACHE_TTL = int(os.getenv("PROFILE_CACHE_TTL", 600))
+    PROFILE_CACHE_STALE_TTL = int(os.getenv("PROFILE_CACHE_STALE_TTL", 60))
+    PROFILE_CACHE_L1_TTL = int(os.getenv("PROFILE_CACHE_L1_TTL", 5))
+
+    # Admin user list: page size cap and how long the total-count estimate is reused
+    USER_LIST_MAX_LIMIT = 200
+    USER_COUNT_CACHE_SECONDS = int(os.getenv("USER_COUNT_CACHE_SECONDS", 60))
+
 
     UPLOAD_FOLDER = os.path.join(os.path.abspath(os.path.dirname(__file__)), "static/uploads")
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024
@@ -51,13 +71,54 @@ class Config:
     SQLALCHEMY_DATABASE_URI = "mssql+pyodbc:///?odbc_connect=" + urllib.parse.quote_plus(odbc_str)
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
-# Set to None to remove Flask-level upload limits
-    MAX_CONTENT_LENGTH = None 
+# Hard cap for a profile image; the request body limit leaves room for multipart overhead
+    PROFILE_IMAGE_MAX_BYTES = int(os.getenv("PROFILE_IMAGE_MAX_BYTES", 5 * 1024 * 1024))
+    MAX_CONTENT_LENGTH = PROFILE_IMAGE_MAX_BYTES + 64 * 1024
     UPLOAD_FOLDER = os.path.join(os.getcwd(), 'uploads/profiles')
 
+# Profile image pipeline: uploads are re-encoded into these square thumbnail sizes (px)
+    PROFILE_IMAGE_SIZES = (64, 128, 256)
+    PROFILE_IMAGE_FORMAT = os.getenv("PROFILE_IMAGE_FORMAT", "WEBP")  # WEBP or JPEG
+    PROFILE_IMAGE_QUALITY = int(os.getenv("PROFILE_IMAGE_QUALITY", 80))
+    PROFILE_IMAGE_WORKERS = int(os.getenv("PROFILE_IMAGE_WORKERS", 2))
+    # Let a front proxy send the bytes: None, "x-accel-redirect" (nginx) or "x-sendfile" (apache/lighttpd).
+    # For nginx, PROFILE_IMAGE_ACCEL_PREFIX must be an `internal` location aliased to UPLOAD_FOLDER.
+    PROFILE_IMAGE_SENDFILE = os.getenv("PROFILE_IMAGE_SENDFILE") or None
+    PROFILE_IMAGE_ACCEL_PREFIX = os.getenv("PROFILE_IMAGE_ACCEL_PREFIX", "/protected/profiles/")
+    # Orphan GC leaves files younger than this alone (uploads still being saved/processed)
+    PROFILE_IMAGE_GC_GRACE_SECONDS = int(os.getenv("PROFILE_IMAGE_GC_GRACE_SECONDS", 3600))
+
+# Calls to service-app (utils/service_client.py); timeouts in seconds
+    QUIZ_SERVICE_URL = os.getenv("QUIZ_SERVICE_URL", "http://127.0.0.1:5000")
+    SERVICE_CONNECT_TIMEOUT = float(os.getenv("SERVICE_CONNECT_TIMEOUT", 2))
+    SERVICE_READ_TIMEOUT = float(os.getenv("SERVICE_READ_TIMEOUT", 15))
+    SERVICE_MAX_RETRIES = int(os.getenv("SERVICE_MAX_RETRIES", 2))
+    SERVICE_POOL_SIZE = int(os.getenv("SERVICE_POOL_SIZE", 20))
+
+# Response compression (utils/compression.py); brotli is used when installed and accepted
+    COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", 1024))
+    COMPRESS_GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", 6))
+    COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", 5))
+    COMPRESS_CACHE_BYTES = int(os.getenv("COMPRESS_CACHE_BYTES", 32 * 1024 * 1024))
+
+# "orjson" (utils/json_provider.py, when installed) or "default" (stdlib json)
+    JSON_PROVIDER = os.getenv("JSON_PROVIDER", "orjson")
+
 # Auth / Security rules
     MAX_FAILED_LOGINS = 3
     LOCK_TIME_MINUTES = 1  # testing
+    FAILED_LOGIN_WINDOW_SECONDS = int(os.getenv("FAILED_LOGIN_WINDOW_SECONDS", 15 * 60))
+
+# Password hashing (werkzeug method string, e.g. "scrypt:32768:8:1" or "pbkdf2:sha256:600000").
+# Changing the method/cost rehashes stored passwords transparently on next login.
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+    PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")  # "thread" or "process"
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 2))
+
+# Sliding-window login limits (kept in Redis)
+    LOGIN_WINDOW_SECONDS = int(os.getenv("LOGIN_WINDOW_SECONDS", 60))
+    LOGIN_MAX_ATTEMPTS_PER_IP = int(os.getenv("LOGIN_MAX_ATTEMPTS_PER_IP", 20))
+    LOGIN_MAX_ATTEMPTS_PER_ACCOUNT = int(os.getenv("LOGIN_MAX_ATTEMPTS_PER_ACCOUNT", 10))
 
     MAIL_SERVER = os.getenv("MAIL_SERVER", "smtp.gmail.com")
     MAIL_PORT = int(os.getenv("MAIL_PORT", 587))
@@ -0,0 +1,40 @@
+from typing import Annotated
+import msgspec
+from msgspec import UNSET, Meta, UnsetType
+
+# Request bodies decoded straight from the raw JSON bytes by decoders compiled once at
+# import; unknown fields and wrong types are rejected before any DB work.
+
+
+# PUT /api/users/profile: only the fields present are changed
+class ProfileUpdate(msgspec.Struct, forbid_unknown_fields=True):
+    first_name: Annotated[str, Meta(pattern=r"\S", max_length=50)] | UnsetType = UNSET
+    last_name: Annotated[str, Meta(pattern=r"\S", max_length=50)] | UnsetType = UNSET
+    # YYYY-MM-DD, or empty/null to clear
+    birth_date: Annotated[str, Meta(pattern=r"^(\d{4}-\d{2}-\d{2})?$")] | None | UnsetType = UNSET
+    gender: Annotated[str, Meta(max_length=10)] | None | UnsetType = UNSET
+    country: Annotated[str, Meta(max_length=50)] | None | UnsetType = UNSET
+    street: Annotated[str, Meta(max_length=100)] | None | UnsetType = UNSET
+    street_number: Annotated[str, Meta(max_length=10)] | None | UnsetType = UNSET
+
+    def changes(self):
+        """{field: value} of the fields that were sent."""
+        return {
+            field: getattr(self, field)
+            for field in self.__struct_fields__
+            if getattr(self, field) is not UNSET
+        }
+
+
+_DECODERS = {
+    struct_type: msgspec.json.Decoder(struct_type)
+    for struct_type in (ProfileUpdate,)
+}
+
+
+def decode_request(struct_type, body):
+    """Raw request bytes -> struct_type instance; ValueError with the offending path otherwise."""
+    try:
+        return _DECODERS[struct_type].decode(body)
+    except (msgspec.ValidationError, msgspec.DecodeError) as e:
+        raise ValueError(f"Invalid payload: {e}")
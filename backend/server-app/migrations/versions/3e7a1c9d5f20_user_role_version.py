@@ -0,0 +1,26 @@
+"""user role version
+
+Revision ID: 3e7a1c9d5f20
+Revises: b916a4842043
+Create Date: 2026-10-19 19:12:05.418263
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3e7a1c9d5f20'
+down_revision = 'b916a4842043'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('role_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('role_version')
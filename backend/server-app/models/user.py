@@ -1,7 +1,7 @@
-from datetime import datetime, timezone, timedelta
+from datetime import datetime, timezone
 from enum import Enum
 from extensions import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from utils.password_hasher import hash_password, verify_password, needs_rehash
 
 class Role(Enum):
     PLAYER = "IGRAC"
@@ -25,6 +25,8 @@ class User(db.Model):
 
     # Storing as string for better SQL Server compatibility
     role = db.Column(db.String(20), nullable=False, default=Role.PLAYER.value)
+    # Bumped on every role change; tokens carry it as "rv" (see utils/role_version.py)
+    role_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     profile_image = db.Column(db.String(255), nullable=True)
     failed_logins = db.Column(db.Integer, default=0, nullable=False)
@@ -40,10 +42,13 @@ class User(db.Model):
         super(User, self).__init__(**kwargs)
             
     def set_password(self, password: str):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
 
     def check_password(self, password: str) -> bool:
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
+
+    def password_needs_rehash(self) -> bool:
+        return needs_rehash(self.password_hash)
 
     # --- Enhanced Lockout Logic ---
     def is_locked(self) -> bool:
@@ -51,18 +56,6 @@ class User(db.Model):
             return True
         return False
 
-    def handle_failed_login(self):
-        self.failed_logins += 1
-        if self.failed_logins >= 3:
-            # Set lock for 1 minute as per your testing requirement
-            self.locked_until = datetime.now(timezone.utc) + timedelta(minutes=1)
-        db.session.commit()
-
-    def reset_login_attempts(self):
-        self.failed_logins = 0
-        self.locked_until = None
-        db.session.commit()
-
 # --- For JWT Logout Implementation ---
 class TokenBlocklist(db.Model):
     id = db.Column(db.Integer, primary_key=True)
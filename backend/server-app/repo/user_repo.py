@@ -1,6 +1,7 @@
 from datetime import datetime, timezone, timedelta
+from sqlalchemy import func, or_
 from extensions import db
-from models.user import User
+from models.user import User, TokenBlocklist
 from config import Config 
 
 class UserRepository:
@@ -13,8 +14,35 @@ class UserRepository:
         return User.query.filter_by(email=email).first()
 
     @staticmethod
-    def get_all():
-        return User.query.all()
+    def _apply_list_filters(query, search=None, role=None):
+        if role:
+            query = query.filter(User.role == role)
+        if search:
+            pattern = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            if "@" in search:
+                # Looks like an email -> prefix seek on ix_users_email only
+                query = query.filter(User.email.like(pattern, escape="\\"))
+            else:
+                query = query.filter(or_(
+                    User.email.like(pattern, escape="\\"),
+                    User.first_name.like(pattern, escape="\\"),
+                    User.last_name.like(pattern, escape="\\"),
+                ))
+        return query
+
+    @staticmethod
+    def get_list_page(limit, after_id=None, search=None, role=None):
+        """Keyset page over users.id, projected to the columns the admin list shows."""
+        query = db.session.query(User.id, User.first_name, User.last_name, User.email, User.role)
+        query = UserRepository._apply_list_filters(query, search, role)
+        if after_id is not None:
+            query = query.filter(User.id > after_id)
+        return query.order_by(User.id).limit(limit).all()
+
+    @staticmethod
+    def count_list(search=None, role=None):
+        query = UserRepository._apply_list_filters(db.session.query(func.count(User.id)), search, role)
+        return query.scalar()
 
     @staticmethod
     def save(user):
@@ -28,27 +56,46 @@ class UserRepository:
         db.session.commit()
 
     @staticmethod
-    def handle_failed_login(user, lockout_minutes=Config.LOCK_TIME_MINUTES):
-        user.failed_logins += 1
-        if user.failed_logins >= Config.MAX_FAILED_LOGINS:
-            user.locked_until = datetime.now(timezone.utc) + timedelta(minutes=lockout_minutes)
+    def lock_account(user, lockout_minutes=Config.LOCK_TIME_MINUTES):
+        user.locked_until = datetime.now(timezone.utc) + timedelta(minutes=lockout_minutes)
         db.session.commit()
         return user
 
-    @staticmethod
-    def reset_login_attempts(user):
-        user.failed_logins = 0
-        user.locked_until = None
-        db.session.commit()
-
     @staticmethod
     def update_role(user, new_role):
         user.role = new_role
         db.session.commit()
         return user
 
+    @staticmethod
+    def get_referenced_profile_images():
+        rows = db.session.query(User.profile_image).filter(User.profile_image.isnot(None)).distinct()
+        return {row.profile_image for row in rows}
+
     @staticmethod
     def update_profile_image(user, image_path):
         user.profile_image = image_path
         db.session.commit()
         return user
+
+    # --- Revocations kept in the DB while Redis is unavailable ---
+    @staticmethod
+    def add_blocklisted_token(jti):
+        db.session.add(TokenBlocklist(jti=jti))
+        db.session.commit()
+
+    @staticmethod
+    def is_token_blocklisted(jti):
+        return db.session.query(TokenBlocklist.id).filter_by(jti=jti).first() is not None
+
+    @staticmethod
+    def get_blocklisted_tokens(created_after):
+        return TokenBlocklist.query.filter(TokenBlocklist.created_at > created_after).all()
+
+    @staticmethod
+    def delete_blocklisted_tokens(tokens=(), created_before=None):
+        for token in tokens:
+            db.session.delete(token)
+        if created_before is not None:
+            TokenBlocklist.query.filter(TokenBlocklist.created_at <= created_before).delete(synchronize_session=False)
+        db.session.commit()
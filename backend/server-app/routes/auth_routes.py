@@ -16,7 +16,7 @@ def login():
     data = request.get_json()
     email = data.get('email')
     password = data.get('password')
-    api_response, token = auth_service.login_user(email, password)
+    api_response, token = auth_service.login_user(email, password, request.remote_addr)
     
     flask_resp = make_response(jsonify(api_response.value), api_response.status_code)
     
@@ -28,8 +28,8 @@ def login():
 @auth_bp.route('/logout', methods=['POST'])
 @jwt_required()
 def logout():
-    jti = get_jwt()["jti"]
-    api_response = auth_service.logout_user(jti)
+    claims = get_jwt()
+    api_response = auth_service.logout_user(claims["jti"], claims["exp"])
     
     flask_resp = make_response(jsonify(api_response.value), api_response.status_code)
     unset_jwt_cookies(flask_resp)
@@ -1,36 +1,55 @@
 import os
-import json
-from flask import Blueprint, request, jsonify, current_app, send_from_directory
+import mimetypes
+from flask import Blueprint, request, jsonify, current_app, send_from_directory, make_response
 from services.user_service import UserService
+from services.image_service import ImageService
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from utils.decorators import admin_required
-from extensions import cache
+from utils.two_tier_cache import TwoTierCache
+from dto.request_dto import ProfileUpdate, decode_request
+from config import Config
 
 user_bp = Blueprint('user', __name__)
+
+# Stored image names never change content (digest or uuid based), so they can be cached forever
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+# A bare digest switches from the original to its thumbnail once processing finishes
+ALIAS_MAX_AGE = 300
+DEFAULT_AVATAR_MAX_AGE = 300
 user_service = UserService()
+profile_cache = TwoTierCache(
+    "user_profile",
+    ttl=Config.PROFILE_CACHE_TTL,
+    stale_ttl=Config.PROFILE_CACHE_STALE_TTL,
+    l1_ttl=Config.PROFILE_CACHE_L1_TTL,
+)
+
+def _cached_profile(user_id):
+    def load():
+        response = user_service.get_profile(user_id)
+        return response.value if response.status_code == 200 else None
+
+    profile = profile_cache.get_or_load(user_id, load)
+    if profile is None:
+        return jsonify("User not found"), 404
+    return jsonify(profile), 200
 
 @user_bp.route('/profile', methods=['GET'])
 @jwt_required()
 def get_my_profile():
-    user_id = get_jwt_identity()
-    cache_key = f"user_profile:{user_id}"
-    cached_data = cache.get(cache_key)
-    if cached_data:
-        return jsonify(json.loads(cached_data)), 200
-
-    response = user_service.get_profile(user_id)
-    if response.status_code == 200:
-        cache.setex(cache_key, 600, json.dumps(response.value))
-    return jsonify(response.value), response.status_code
+    return _cached_profile(get_jwt_identity())
 
 @user_bp.route('/profile', methods=['PUT'])
 @jwt_required()
 def update_my_profile():
     user_id = get_jwt_identity()
-    data = request.get_json()
-    response = user_service.update_profile(user_id, data)
+    try:
+        update = decode_request(ProfileUpdate, request.get_data())
+    except ValueError as e:
+        return jsonify(str(e)), 400
+    response = user_service.update_profile(user_id, update)
     if response.status_code == 200:
-        cache.delete(f"user_profile:{user_id}")
+        profile_cache.delete(user_id)
     return jsonify(response.value), response.status_code
 
 @user_bp.route('/profile/image', methods=['POST'])
@@ -42,7 +61,7 @@ def upload_image():
     file = request.files['file']
     response = user_service.update_profile_image(user_id, file)
     if response.status_code == 200:
-        cache.delete(f"user_profile:{user_id}")
+        profile_cache.delete(user_id)
     return jsonify(response.value), response.status_code
 
 @user_bp.route('/profile', methods=['DELETE'])
@@ -51,35 +70,80 @@ def delete_my_account():
     user_id = get_jwt_identity()
     response = user_service.delete_user(user_id)
     if response.status_code == 200:
-        cache.delete(f"user_profile:{user_id}")
+        profile_cache.delete(user_id)
     return jsonify(response.value), response.status_code
 
+def _default_avatar_response():
+    data, etag = ImageService.default_avatar()
+    resp = make_response(data)
+    resp.mimetype = 'image/png'
+    resp.set_etag(etag)
+    resp.cache_control.public = True
+    resp.cache_control.max_age = DEFAULT_AVATAR_MAX_AGE
+    return resp.make_conditional(request)
+
 @user_bp.route('/profile/image/<filename>', methods=['GET'])
 def get_profile_image(filename):
     upload_dir = current_app.config.get('UPLOAD_FOLDER', 'static/uploads/profiles')
-    file_path = os.path.join(upload_dir, filename)
-    if not os.path.exists(file_path):
-        return send_from_directory('static/assets', 'default-avatar.png')
-    return send_from_directory(upload_dir, filename)
+    mimetype = None
+    max_age = IMMUTABLE_MAX_AGE
+    if ImageService.is_digest(filename):
+        filename, mimetype = ImageService.resolve(upload_dir, filename)
+        max_age = ALIAS_MAX_AGE
+
+    # The stored name is the validator, so revalidation needs no filesystem access
+    if max_age == IMMUTABLE_MAX_AGE and request.if_none_match.contains(filename):
+        resp = make_response('', 304)
+        resp.set_etag(filename)
+    else:
+        relative_path = ImageService.relative_path(filename)
+        file_path = os.path.join(upload_dir, relative_path)
+        if not os.path.exists(file_path):
+            return _default_avatar_response()
+
+        mode = current_app.config.get('PROFILE_IMAGE_SENDFILE')
+        if mode in ('x-accel-redirect', 'x-sendfile'):
+            resp = make_response('')
+            resp.mimetype = mimetype or mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+            resp.set_etag(filename)
+            if mode == 'x-accel-redirect':
+                resp.headers['X-Accel-Redirect'] = current_app.config['PROFILE_IMAGE_ACCEL_PREFIX'] + relative_path.replace(os.sep, '/')
+            else:
+                resp.headers['X-Sendfile'] = os.path.abspath(file_path)
+        else:
+            # conditional=True (default) handles If-None-Match and Range requests
+            resp = send_from_directory(upload_dir, relative_path, mimetype=mimetype, etag=filename, max_age=max_age)
+
+    resp.cache_control.public = True
+    resp.cache_control.max_age = max_age
+    if max_age == IMMUTABLE_MAX_AGE:
+        resp.cache_control.immutable = True
+    return resp
 
 @user_bp.route('/', methods=['GET'])
 @admin_required 
 def list_users():
-    response = user_service.get_all_users()
+    limit = request.args.get('limit', default=50, type=int)
+    limit = max(1, min(limit, Config.USER_LIST_MAX_LIMIT))
+    response = user_service.get_all_users(
+        limit=limit,
+        after_id=request.args.get('after', type=int),
+        search=request.args.get('q'),
+        role_name=request.args.get('role'),
+    )
     return jsonify(response.value), response.status_code
 
 @user_bp.route('/<int:user_id>', methods=['GET'])
 @admin_required
 def get_user_by_id(user_id):
-    response = user_service.get_profile(user_id)
-    return jsonify(response.value), response.status_code
+    return _cached_profile(user_id)
 
 @user_bp.route('/<int:user_id>', methods=['DELETE'])
 @admin_required
 def admin_delete_user(user_id):
     response = user_service.delete_user(user_id)
     if response.status_code == 200:
-        cache.delete(f"user_profile:{user_id}")
+        profile_cache.delete(user_id)
     return jsonify(response.value), response.status_code
 
 @user_bp.route('/<int:user_id>/role', methods=['PATCH'])
@@ -89,5 +153,10 @@ def change_role(user_id):
     new_role = data.get('role')
     response = user_service.change_user_role(user_id, new_role)
     if response.status_code == 200:
-        cache.delete(f"user_profile:{user_id}")
+        profile_cache.delete(user_id)
     return jsonify(response.value), response.status_code
+
+@user_bp.route('/cache-stats', methods=['GET'])
+@admin_required
+def cache_stats():
+    return jsonify({"user_profile": profile_cache.stats()}), 200
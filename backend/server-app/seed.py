@@ -35,7 +35,7 @@ def seed_admin():
             role=Role.ADMIN.value
         )
         
-        # This uses werkzeug.security.generate_password_hash internally
+        # This hashes via utils.password_hasher (configured method, bounded pool)
         admin.set_password("SuperSecretAdmin123!")
 
         # 4. Save via Repository
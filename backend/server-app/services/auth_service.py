@@ -3,8 +3,16 @@ from flask_jwt_extended import create_access_token
 from models.user import User, Role
 from repo.user_repo import UserRepository
 from utils.ApiResponse import ApiResponse, StatusCodes
+from utils.login_throttle import LoginThrottle
+from utils.token_revocation import revoke_token, is_seeded, mark_seeded
+from utils.role_version import publish_role_version
+from config import Config
 import re
 
+# This process stored revocations in the DB that Redis doesn't have yet
+_blocklist_pending = False
+
+
 class AuthService:
     def __init__(self):
         self.repo = UserRepository()
@@ -45,10 +53,13 @@ class AuthService:
         except TypeError as e:
             return ApiResponse({"message": f"Data mapping error: {str(e)}"}, StatusCodes.BAD_REQUEST)
 
-    def login_user(self, email, password):
+    def login_user(self, email, password, ip=None):
         if not email or not password:
             return ApiResponse({"message": "Email and password are required"}, StatusCodes.BAD_REQUEST), None
 
+        if not LoginThrottle.allow_attempt(email, ip):
+            return ApiResponse({"message": "Too many login attempts. Try again later."}, StatusCodes.TOO_MANY_REQUESTS), None
+
         user = self.repo.get_by_email(email)
 
         if not user:
@@ -59,9 +70,17 @@ class AuthService:
             return ApiResponse({"message": f"Account locked. Try again in {remaining_time} seconds."}, StatusCodes.FORBIDDEN), None
 
         if user.check_password(password):
-            self.repo.reset_login_attempts(user)
+            # Failure counter lives in Redis, so a successful login doesn't write to the DB
+            LoginThrottle.reset_failures(user.id)
+
+            # Hash parameters changed since this password was stored -> upgrade it now
+            if user.password_needs_rehash():
+                user.set_password(password)
+                self.repo.save(user)
             
-            additional_claims = {"role": user.role, "email":user.email}
+            # Re-seeds Redis in case it lost the key; the token carries the stored version either way
+            publish_role_version(user.id, user.role_version)
+            additional_claims = {"role": user.role, "email":user.email, "rv": user.role_version}
             access_token = create_access_token(identity=str(user.id), additional_claims=additional_claims)
             
             return ApiResponse({
@@ -69,8 +88,37 @@ class AuthService:
                 "role": user.role
             }, StatusCodes.SUCCESS), access_token
         else:
-            self.repo.handle_failed_login(user)
+            if LoginThrottle.register_failure(user.id) >= Config.MAX_FAILED_LOGINS:
+                # Only the lockout itself is persisted
+                self.repo.lock_account(user)
+                LoginThrottle.reset_failures(user.id)
             return ApiResponse({"message": "Invalid credentials"}, StatusCodes.UNAUTHORIZED), None
 
-    def logout_user(self, jti):
+    def logout_user(self, jti, expires_at):
+        global _blocklist_pending
+        if revoke_token(jti, expires_at):
+            if _blocklist_pending or not is_seeded():
+                self._replay_blocklisted_tokens()
+        else:
+            # Redis is down: this app checks the DB row until Redis has it (see app.py)
+            self.repo.add_blocklisted_token(jti)
+            _blocklist_pending = True
         return ApiResponse({"message": "Successfully logged out"}, StatusCodes.SUCCESS)
+
+    def _replay_blocklisted_tokens(self):
+        """
+        Copies revocations stored during a Redis outage into Redis, so service-app sees
+        them too. Runs only when this process stored some or Redis lost its data.
+        """
+        global _blocklist_pending
+        # A token expired at most one lifetime after its logout; older rows are dropped
+        cutoff = (datetime.now(timezone.utc) - Config.JWT_ACCESS_TOKEN_EXPIRES).replace(tzinfo=None)
+        replayed = []
+        for token in self.repo.get_blocklisted_tokens(cutoff):
+            created_at = token.created_at.replace(tzinfo=token.created_at.tzinfo or timezone.utc)
+            if not revoke_token(token.jti, (created_at + Config.JWT_ACCESS_TOKEN_EXPIRES).timestamp()):
+                return
+            replayed.append(token)
+        self.repo.delete_blocklisted_tokens(replayed, created_before=cutoff)
+        mark_seeded()
+        _blocklist_pending = False
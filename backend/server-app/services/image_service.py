@@ -0,0 +1,207 @@
+import hashlib
+import io
+import os
+import re
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageDraw, ImageOps, UnidentifiedImageError, features
+from config import Config
+
+# Thumbnails are produced off the request thread; Pillow releases the GIL while decoding/resizing
+_executor = ThreadPoolExecutor(max_workers=Config.PROFILE_IMAGE_WORKERS, thread_name_prefix="imgproc")
+
+_DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+_DIGEST_PREFIX_RE = re.compile(r"^([0-9a-f]{64})(?:\.src|_\d+\.\w+)$")
+IMAGE_URL_PREFIX = "/api/users/profile/image/"
+DEFAULT_AVATAR_PATH = os.path.join(os.path.abspath(os.path.dirname(__file__)), "..", "static", "assets", "default-avatar.png")
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+_default_avatar = None
+
+
+class InvalidImageError(ValueError):
+    pass
+
+
+class ImageTooLargeError(ValueError):
+    pass
+
+
+class ImageService:
+    """
+    Content-addressed profile images.
+
+    An upload is stored once as `<sha256>.src`; a background job re-encodes it into
+    `<sha256>_<size>.<ext>` square thumbnails for every PROFILE_IMAGE_SIZES entry.
+    Identical uploads hash to the same name, so they are stored and processed once.
+    Files live in `<d[0:2]>/<d[2:4]>/` shard directories under UPLOAD_FOLDER (older,
+    uuid-named uploads stay in the root). User.profile_image holds the digest.
+    """
+
+    @staticmethod
+    def output_format():
+        if Config.PROFILE_IMAGE_FORMAT == "WEBP" and features.check("webp"):
+            return "WEBP", "webp"
+        return "JPEG", "jpg"
+
+    @staticmethod
+    def is_digest(name):
+        return bool(name) and bool(_DIGEST_RE.match(name))
+
+    @staticmethod
+    def source_name(digest):
+        return f"{digest}.src"
+
+    @staticmethod
+    def variant_name(digest, size):
+        return f"{digest}_{size}.{ImageService.output_format()[1]}"
+
+    @staticmethod
+    def shard_dir(digest):
+        return os.path.join(digest[:2], digest[2:4])
+
+    @staticmethod
+    def relative_path(filename):
+        """Path of a stored file relative to UPLOAD_FOLDER (sharded for content-addressed names)."""
+        match = _DIGEST_PREFIX_RE.match(filename)
+        if match:
+            return os.path.join(ImageService.shard_dir(match.group(1)), filename)
+        return filename
+
+    @staticmethod
+    def image_name(filename):
+        """Digest a stored file belongs to, or the filename itself for legacy uploads."""
+        match = _DIGEST_PREFIX_RE.match(filename)
+        return match.group(1) if match else filename
+
+    @staticmethod
+    def file_names(digest):
+        return [ImageService.source_name(digest)] + [
+            ImageService.variant_name(digest, size) for size in Config.PROFILE_IMAGE_SIZES
+        ]
+
+    @staticmethod
+    def image_urls(digest):
+        """Size -> URL map for the profile API; None for legacy (non content-addressed) names."""
+        if not ImageService.is_digest(digest):
+            return None
+        return {
+            str(size): IMAGE_URL_PREFIX + ImageService.variant_name(digest, size)
+            for size in Config.PROFILE_IMAGE_SIZES
+        }
+
+    @staticmethod
+    def variants_ready(upload_dir, digest):
+        return all(
+            os.path.exists(os.path.join(upload_dir, ImageService.relative_path(ImageService.variant_name(digest, size))))
+            for size in Config.PROFILE_IMAGE_SIZES
+        )
+
+    @staticmethod
+    def resolve(upload_dir, digest):
+        """
+        File to serve for a bare digest: the largest thumbnail, or the original
+        (with its sniffed mimetype) while thumbnails are still being generated.
+        """
+        largest = ImageService.variant_name(digest, max(Config.PROFILE_IMAGE_SIZES))
+        if os.path.exists(os.path.join(upload_dir, ImageService.relative_path(largest))):
+            return largest, None
+
+        source = ImageService.source_name(digest)
+        try:
+            with Image.open(os.path.join(upload_dir, ImageService.relative_path(source))) as img:
+                return source, img.get_format_mimetype()
+        except (OSError, UnidentifiedImageError):
+            return source, None
+
+    @staticmethod
+    def store_upload(upload_dir, stream, max_bytes):
+        """
+        Streams the upload to disk in chunks while hashing it, validates it, moves it to
+        its content-addressed place, schedules thumbnailing and returns the digest.
+        """
+        os.makedirs(upload_dir, exist_ok=True)
+        tmp_path = os.path.join(upload_dir, f"upload-{uuid.uuid4().hex}.tmp")
+        hasher = hashlib.sha256()
+        written = 0
+        try:
+            with open(tmp_path, "wb") as f:
+                while True:
+                    chunk = stream.read(UPLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    written += len(chunk)
+                    if written > max_bytes:
+                        raise ImageTooLargeError(f"Image exceeds {max_bytes} bytes")
+                    hasher.update(chunk)
+                    f.write(chunk)
+
+            try:
+                with Image.open(tmp_path) as img:
+                    img.verify()
+            except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+                raise InvalidImageError("Unsupported or corrupt image")
+
+            digest = hasher.hexdigest()
+            if ImageService.variants_ready(upload_dir, digest):
+                # Same picture was uploaded before; restart the GC grace period of its files
+                ImageService.touch_image(upload_dir, digest)
+                return digest
+
+            os.makedirs(os.path.join(upload_dir, ImageService.shard_dir(digest)), exist_ok=True)
+            source_path = os.path.join(upload_dir, ImageService.relative_path(ImageService.source_name(digest)))
+            if not os.path.exists(source_path):
+                os.replace(tmp_path, source_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        _executor.submit(ImageService._build_variants, upload_dir, digest)
+        return digest
+
+    @staticmethod
+    def touch_image(upload_dir, digest):
+        """Bumps the mtime of an image's files, which image_gc only removes after a grace period."""
+        for filename in ImageService.file_names(digest):
+            try:
+                os.utime(os.path.join(upload_dir, ImageService.relative_path(filename)))
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def _build_variants(upload_dir, digest):
+        source_path = os.path.join(upload_dir, ImageService.relative_path(ImageService.source_name(digest)))
+        fmt, _ = ImageService.output_format()
+        try:
+            with Image.open(source_path) as img:
+                img = ImageOps.exif_transpose(img).convert("RGB")
+                for size in Config.PROFILE_IMAGE_SIZES:
+                    target = os.path.join(upload_dir, ImageService.relative_path(ImageService.variant_name(digest, size)))
+                    if os.path.exists(target):
+                        continue
+                    thumb = ImageOps.fit(img, (size, size), Image.LANCZOS)
+                    tmp_path = f"{target}.{os.getpid()}.tmp"
+                    thumb.save(tmp_path, fmt, quality=Config.PROFILE_IMAGE_QUALITY)
+                    os.replace(tmp_path, target)
+        except Exception as e:
+            print("IMAGE PIPELINE ERROR:", digest, e)
+
+    @staticmethod
+    def default_avatar():
+        """(png_bytes, etag) of the fallback avatar, loaded or drawn once and kept in memory."""
+        global _default_avatar
+        if _default_avatar is None:
+            if os.path.exists(DEFAULT_AVATAR_PATH):
+                with open(DEFAULT_AVATAR_PATH, "rb") as f:
+                    data = f.read()
+            else:
+                size = max(Config.PROFILE_IMAGE_SIZES)
+                img = Image.new("RGB", (size, size), (226, 232, 240))
+                draw = ImageDraw.Draw(img)
+                draw.ellipse((size * 0.32, size * 0.16, size * 0.68, size * 0.52), fill=(148, 163, 184))
+                draw.ellipse((size * 0.16, size * 0.58, size * 0.84, size * 1.2), fill=(148, 163, 184))
+                buf = io.BytesIO()
+                img.save(buf, "PNG", optimize=True)
+                data = buf.getvalue()
+            _default_avatar = (data, hashlib.sha256(data).hexdigest()[:32])
+        return _default_avatar
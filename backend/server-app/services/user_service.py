@@ -1,10 +1,13 @@
+from datetime import datetime
 from repo.user_repo import UserRepository
 from utils.ApiResponse import ApiResponse, StatusCodes
-from models.user import Role
-import os
-import uuid
-from werkzeug.utils import secure_filename
+from models.user import Role, User
+from services.image_service import ImageService, InvalidImageError, ImageTooLargeError
 from utils.email_service import send_rolechange_email
+from utils.role_version import bump_role_version, publish_role_version
+from extensions import cache
+from config import Config
+import redis
 
 class UserService:
     def __init__(self):
@@ -21,29 +24,27 @@ class UserService:
         from flask import current_app
         # Use .get() to avoid KeyErrors if UPLOAD_FOLDER isn't set
         upload_dir = current_app.config.get('UPLOAD_FOLDER', 'static/uploads/profiles')
-        
-        if not os.path.exists(upload_dir):
-            os.makedirs(upload_dir)
 
-        # Generate unique name
-        original_filename = secure_filename(file.filename)
-        extension = original_filename.rsplit('.', 1)[1].lower() if '.' in original_filename else 'jpg'
-        unique_name = f"{uuid.uuid4().hex}.{extension}"
-        
-        file_path = os.path.join(upload_dir, unique_name)
+        max_bytes = current_app.config.get('PROFILE_IMAGE_MAX_BYTES', Config.PROFILE_IMAGE_MAX_BYTES)
 
         try:
-            file.save(file_path)
-            # Update DB
-            user.profile_image = unique_name
-            self.repo.save(user)
-            
-            # Returns the exact format you requested
-            return ApiResponse({"image_name": unique_name}, StatusCodes.SUCCESS)
-            
-        except Exception as e:
+            # Stored content-addressed; thumbnails are generated in the background
+            digest = ImageService.store_upload(upload_dir, file.stream, max_bytes)
+        except ImageTooLargeError as e:
+            return ApiResponse(str(e), StatusCodes.PAYLOAD_TOO_LARGE)
+        except InvalidImageError as e:
+            return ApiResponse(str(e), StatusCodes.BAD_REQUEST)
+        except OSError as e:
             return ApiResponse(f"File system error: {str(e)}", StatusCodes.INTERNAL_SERVER_ERROR)
 
+        # The previous image is left to workers/image_gc.py: identical uploads share files,
+        # and another user may be reusing them right now without having committed yet
+        self.repo.update_profile_image(user, digest)
+        return ApiResponse({
+            "image_name": digest,
+            "image_urls": ImageService.image_urls(digest)
+        }, StatusCodes.SUCCESS)
+
     def get_profile(self, user_id):
         user = self.repo.get_by_id(user_id)
         if not user:
@@ -54,68 +55,96 @@ class UserService:
             "first_name": user.first_name,
             "last_name": user.last_name,
             "email": user.email,
-            "birth_date": str(user.birth_date),
+            "birth_date": user.birth_date.isoformat() if user.birth_date else None,
             "gender": user.gender,
             "country": user.country,
             "street": user.street,
             "street_number": user.street_number,
             "role": user.role,
-            "profile_image": user.profile_image
+            "profile_image": user.profile_image,
+            "profile_image_urls": ImageService.image_urls(user.profile_image)
         }
         return ApiResponse(user_data, StatusCodes.SUCCESS)
 
-    def update_profile(self, user_id, update_data):
-        if not update_data:
+    def update_profile(self, user_id, update):
+        """Applies a decoded ProfileUpdate (dto/request_dto.py); only the sent fields change."""
+        changes = update.changes()
+        if not changes:
             return ApiResponse("No data provided for update", StatusCodes.BAD_REQUEST)
 
+        # HANDLE DATE CONVERSION (format already checked; empty clears it)
+        if 'birth_date' in changes:
+            try:
+                changes['birth_date'] = (
+                    datetime.strptime(changes['birth_date'], '%Y-%m-%d').date() if changes['birth_date'] else None
+                )
+            except ValueError:
+                return ApiResponse("Invalid date format. Use YYYY-MM-DD", StatusCodes.BAD_REQUEST)
+
         user = self.repo.get_by_id(user_id)
         if not user:
             return ApiResponse("User not found", StatusCodes.NOT_FOUND)
 
-        # Fields that should NEVER be changed via this endpoint
-        protected_fields = ['id', 'email', 'password_hash', 'role', 'created_at', 'failed_logins', 'locked_until']
+        for key, value in changes.items():
+            setattr(user, key, value)
 
-        # Validation: Prevent clearing names
-        if 'first_name' in update_data and not str(update_data['first_name']).strip():
-            return ApiResponse("First name cannot be empty", StatusCodes.BAD_REQUEST)
-        if 'last_name' in update_data and not str(update_data['last_name']).strip():
-            return ApiResponse("Last name cannot be empty", StatusCodes.BAD_REQUEST)
+        self.repo.save(user)
+        return ApiResponse("Profile updated successfully", StatusCodes.SUCCESS)
 
-        # HANDLE DATE CONVERSION
-        if 'birth_date' in update_data and update_data['birth_date']:
+    def get_all_users(self, limit=50, after_id=None, search=None, role_name=None):
+        role = None
+        if role_name:
             try:
-                if isinstance(update_data['birth_date'], str):
-                    update_data['birth_date'] = datetime.strptime(update_data['birth_date'], '%Y-%m-%d').date()
-            except ValueError:
-                return ApiResponse("Invalid date format. Use YYYY-MM-DD", StatusCodes.BAD_REQUEST)
+                role = Role[role_name].value
+            except KeyError:
+                return ApiResponse("Invalid role specified", StatusCodes.BAD_REQUEST)
 
-        # Dynamic Update
-        for key, value in update_data.items():
-            if hasattr(user, key) and key not in protected_fields:
-                setattr(user, key, value)
-        
-        self.repo.save(user)
-        return ApiResponse("Profile updated successfully", StatusCodes.SUCCESS)
+        search = search.strip() if search else None
+        rows = self.repo.get_list_page(limit + 1, after_id=after_id, search=search, role=role)
+        has_more = len(rows) > limit
+        rows = rows[:limit]
 
-# In services/user_service.py
-    def get_all_users(self):
-        users = self.repo.get_all()
         output = [
             {
                 "id": u.id,
                 "full_name": f"{u.first_name} {u.last_name}",
                 "email": u.email,
                 "role": u.role
-            } for u in users
+            } for u in rows
         ]
-        return ApiResponse(output, StatusCodes.SUCCESS)
+        return ApiResponse({
+            "items": output,
+            "next_cursor": rows[-1].id if has_more else None,
+            "total_estimate": self._estimate_user_count(search, role)
+        }, StatusCodes.SUCCESS)
+
+    def _estimate_user_count(self, search, role):
+        # COUNT(*) is only run once per filter every USER_COUNT_CACHE_SECONDS
+        key = f"users_count:{role or ''}:{(search or '').lower()}"
+        try:
+            cached = cache.get(key)
+            if cached is not None:
+                return int(cached)
+        except redis.RedisError:
+            pass
+
+        total = self.repo.count_list(search, role)
+        try:
+            cache.setex(key, Config.USER_COUNT_CACHE_SECONDS, total)
+        except redis.RedisError:
+            pass
+        return total
 
     def delete_user(self, user_id):
         user = self.repo.get_by_id(user_id)
         if not user:
             return ApiResponse("User not found", StatusCodes.NOT_FOUND)
         
+        # Its profile image is removed by workers/image_gc.py once nobody references it
         self.repo.delete(user)
+
+        # Outstanding tokens of the deleted account stop working right away
+        bump_role_version(user_id)
         return ApiResponse("User account deleted", StatusCodes.SUCCESS)
 
     def change_user_role(self, user_id, new_role_name):
@@ -132,6 +161,8 @@ class UserService:
             return ApiResponse("Invalid role specified", StatusCodes.BAD_REQUEST)
 
         user.role = target_role
+        user.role_version = User.role_version + 1
         self.repo.save(user)
+        publish_role_version(user_id, user.role_version)
         send_rolechange_email(user.email, target_role)
         return ApiResponse(f"User role updated to {target_role}", StatusCodes.SUCCESS)
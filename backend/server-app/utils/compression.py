@@ -0,0 +1,102 @@
+import gzip
+import threading
+from collections import OrderedDict
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {"application/json", "text/html", "text/plain", "text/css", "application/javascript"}
+
+
+class CompressedCache:
+    """LRU of compressed bodies keyed by (ETag, encoding), bounded by total bytes."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            body = self._items.get(key)
+            if body is not None:
+                self._items.move_to_end(key)
+            return body
+
+    def put(self, key, body):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._items[key] = body
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.size -= len(evicted)
+
+
+def compress(data, encoding, gzip_level=6, brotli_quality=5):
+    if encoding == "br":
+        return brotli.compress(data, quality=brotli_quality, mode=brotli.MODE_TEXT)
+    return gzip.compress(data, compresslevel=gzip_level, mtime=0)
+
+
+def choose_encoding(accept_encodings):
+    """Best encoding both sides support: br if the client takes it (and brotli is installed), else gzip."""
+    if brotli is not None and accept_encodings["br"]:
+        return "br"
+    if accept_encodings["gzip"]:
+        return "gzip"
+    return None
+
+
+def init_compression(app):
+    """
+    Compresses eligible responses (compressible type, >= COMPRESS_MIN_SIZE bytes, not
+    already encoded) with br or gzip as negotiated. Bodies of responses with an ETag are
+    kept in an LRU, so a hot payload is compressed once per encoding, not per request.
+    """
+    min_size = app.config.get("COMPRESS_MIN_SIZE", 1024)
+    gzip_level = app.config.get("COMPRESS_GZIP_LEVEL", 6)
+    brotli_quality = app.config.get("COMPRESS_BROTLI_QUALITY", 5)
+    cache = CompressedCache(app.config.get("COMPRESS_CACHE_BYTES", 32 * 1024 * 1024))
+    app.extensions["compressed_cache"] = cache
+
+    @app.after_request
+    def compress_response(response):
+        if (
+            request.method == "HEAD"
+            or response.status_code != 200
+            or response.direct_passthrough
+            or response.is_streamed
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or "no-transform" in response.headers.get("Cache-Control", "")
+        ):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        encoding = choose_encoding(request.accept_encodings)
+        data = response.get_data()
+        if encoding is None or len(data) < min_size:
+            return response
+
+        etag, weak = response.get_etag()
+        body = cache.get((etag, encoding)) if etag else None
+        if body is None:
+            body = compress(data, encoding, gzip_level, brotli_quality)
+            if etag:
+                cache.put((etag, encoding), body)
+
+        response.set_data(body)
+        response.headers["Content-Encoding"] = encoding
+        # Same validator for every encoding, so it may only be a weak one
+        if etag:
+            response.set_etag(etag, weak=True)
+        return response
@@ -0,0 +1,60 @@
+import dataclasses
+import decimal
+import uuid
+from datetime import date, datetime, time
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # stdlib json via DefaultJSONProvider
+    orjson = None
+
+
+def _default(o):
+    # Types neither encoder handles natively; dates match orjson (isoformat, not HTTP dates)
+    if isinstance(o, (datetime, date, time)):
+        return o.isoformat()
+    if isinstance(o, decimal.Decimal):
+        return float(o)
+    if isinstance(o, uuid.UUID):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class IsoJSONProvider(DefaultJSONProvider):
+    """Flask's stdlib provider, with datetimes as ISO 8601 like OrjsonProvider."""
+
+    default = staticmethod(_default)
+
+
+class OrjsonProvider(IsoJSONProvider):
+    """
+    JSON through orjson: compact output, datetimes/dataclasses/UUIDs encoded natively,
+    and bytes handed straight to the response without an intermediate str.
+    """
+
+    options = orjson.OPT_NON_STR_KEYS if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=_default, option=self.options).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=_default, option=self.options), mimetype=self.mimetype
+        )
+
+
+def init_json(app):
+    """Installs the JSON provider named by JSON_PROVIDER ("orjson" or "default")."""
+    if app.config.get("JSON_PROVIDER", "orjson") == "orjson" and orjson is not None:
+        app.json = OrjsonProvider(app)
+    else:
+        app.json = IsoJSONProvider(app)
@@ -0,0 +1,85 @@
+import time
+import uuid
+import redis
+from extensions import cache
+from config import Config
+
+
+class LoginThrottle:
+    """
+    Login brute-force protection kept in Redis instead of the users table.
+
+    - sliding-window limits per IP and per account (sorted set of attempt timestamps)
+    - consecutive failed-attempt counter per user (INCR + EXPIRE in one MULTI)
+
+    Only when the counter reaches MAX_FAILED_LOGINS does the caller persist a
+    lockout in the DB. If Redis is unavailable the throttle fails open so that
+    logins keep working.
+    """
+
+    @staticmethod
+    def _ip_key(ip):
+        return f"login_window:ip:{ip}"
+
+    @staticmethod
+    def _account_key(email):
+        return f"login_window:account:{email.strip().lower()}"
+
+    @staticmethod
+    def _failures_key(user_id):
+        return f"login_failures:{user_id}"
+
+    @staticmethod
+    def _hit_window(key, limit, window_seconds):
+        now = time.time()
+        member = f"{now}:{uuid.uuid4().hex[:8]}"
+
+        pipe = cache.pipeline()
+        pipe.zremrangebyscore(key, 0, now - window_seconds)
+        pipe.zadd(key, {member: now})
+        pipe.zcard(key)
+        pipe.expire(key, window_seconds)
+        _, _, count, _ = pipe.execute()
+
+        if count > limit:
+            # Rejected attempts don't occupy the window, so it stays bounded by the limit
+            cache.zrem(key, member)
+            return False
+        return True
+
+    @staticmethod
+    def allow_attempt(email, ip):
+        """Returns False if either the IP or the account exceeded its sliding-window limit."""
+        try:
+            window = Config.LOGIN_WINDOW_SECONDS
+            if ip and not LoginThrottle._hit_window(
+                LoginThrottle._ip_key(ip), Config.LOGIN_MAX_ATTEMPTS_PER_IP, window
+            ):
+                return False
+            return LoginThrottle._hit_window(
+                LoginThrottle._account_key(email), Config.LOGIN_MAX_ATTEMPTS_PER_ACCOUNT, window
+            )
+        except redis.RedisError as e:
+            print("LOGIN THROTTLE: redis unavailable, allowing attempt:", e)
+            return True
+
+    @staticmethod
+    def register_failure(user_id):
+        """Atomically increments the failure counter and returns the new value."""
+        key = LoginThrottle._failures_key(user_id)
+        try:
+            pipe = cache.pipeline()
+            pipe.incr(key)
+            pipe.expire(key, Config.FAILED_LOGIN_WINDOW_SECONDS)
+            failures, _ = pipe.execute()
+            return int(failures)
+        except redis.RedisError as e:
+            print("LOGIN THROTTLE: redis unavailable, failure not counted:", e)
+            return 0
+
+    @staticmethod
+    def reset_failures(user_id):
+        try:
+            cache.delete(LoginThrottle._failures_key(user_id))
+        except redis.RedisError as e:
+            print("LOGIN THROTTLE: redis unavailable, failures not reset:", e)
@@ -0,0 +1,60 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from werkzeug.security import generate_password_hash, check_password_hash
+from config import Config
+
+# Password hashing is CPU-bound, so it runs on a bounded pool instead of the request thread.
+# hashlib's scrypt/pbkdf2 release the GIL, so the default thread pool hashes in parallel;
+# PASSWORD_HASH_EXECUTOR = "process" is available if that ever stops being true.
+_executor = None
+_executor_lock = threading.Lock()
+_method_prefix = None
+
+
+def _eventlet_patched():
+    try:
+        from eventlet import patcher
+        return patcher.is_monkey_patched("thread")
+    except ImportError:
+        return False
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                workers = Config.PASSWORD_HASH_WORKERS
+                if Config.PASSWORD_HASH_EXECUTOR == "process":
+                    _executor = ProcessPoolExecutor(max_workers=workers)
+                else:
+                    _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pwhash")
+    return _executor
+
+
+def _run(fn, *args):
+    if _eventlet_patched():
+        # Under eventlet the pool threads would be green threads, so use real OS threads instead
+        from eventlet import tpool
+        return tpool.execute(fn, *args)
+    return _get_executor().submit(fn, *args).result()
+
+
+def _current_prefix():
+    """Method prefix werkzeug writes for the configured method, e.g. 'scrypt:32768:8:1'."""
+    global _method_prefix
+    if _method_prefix is None:
+        _method_prefix = generate_password_hash("", method=Config.PASSWORD_HASH_METHOD).split("$", 1)[0]
+    return _method_prefix
+
+
+def hash_password(password: str) -> str:
+    return _run(generate_password_hash, password, Config.PASSWORD_HASH_METHOD)
+
+
+def verify_password(password_hash: str, password: str) -> bool:
+    return _run(check_password_hash, password_hash, password)
+
+
+def needs_rehash(password_hash: str) -> bool:
+    return password_hash.split("$", 1)[0] != _current_prefix()
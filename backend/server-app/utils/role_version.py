@@ -0,0 +1,70 @@
+import time
+import redis
+from extensions import cache
+from config import Config
+
+# Bumped whenever a user's role changes or the account is deleted. Tokens carry the
+# version they were issued with ("rv" claim); a mismatch means the token is stale.
+# users.role_version is the source of truth; Redis holds a copy both apps can check.
+ROLE_VERSION_KEY = "role_version:{}"
+_LOCAL_CACHE_MAX = 10_000
+MISSING = -1
+PLAYER_ROLE = "IGRAC"
+
+_local = {}  # user_id -> (version, fetched_at)
+
+
+def publish_role_version(user_id, version):
+    """Copies the stored version to Redis (after a change, and on login to re-seed it)."""
+    _local.pop(str(user_id), None)
+    try:
+        cache.set(ROLE_VERSION_KEY.format(user_id), version)
+    except redis.RedisError as e:
+        print(f"ROLE VERSION: redis unavailable, version of user {user_id} not published:", e)
+
+
+def get_role_version(user_id):
+    """
+    Version with a short-lived local cache; MISSING if Redis has no key for the user,
+    None if it can't be determined.
+    """
+    now = time.monotonic()
+    cached = _local.get(user_id)
+    if cached and now - cached[1] < Config.ROLE_VERSION_CACHE_SECONDS:
+        return cached[0]
+
+    try:
+        raw = cache.get(ROLE_VERSION_KEY.format(user_id))
+    except redis.RedisError as e:
+        print("ROLE VERSION: redis unavailable, check skipped:", e)
+        return None
+    if raw is None:
+        return MISSING  # not cached: the next login publishes it
+
+    version = int(raw)
+    if len(_local) >= _LOCAL_CACHE_MAX:
+        _local.clear()
+    _local[user_id] = (version, now)
+    return version
+
+
+def bump_role_version(user_id):
+    """For deleted accounts (no row to store it on); if Redis is down, old tokens live until they expire."""
+    _local.pop(str(user_id), None)
+    try:
+        return cache.incr(ROLE_VERSION_KEY.format(user_id))
+    except redis.RedisError as e:
+        print(f"ROLE VERSION: redis unavailable, tokens of user {user_id} not invalidated:", e)
+        return None
+
+
+def is_role_stale(jwt_payload):
+    version = get_role_version(jwt_payload["sub"])
+    if version is None:
+        return False
+    token_version = jwt_payload.get("rv", 0)
+    if version == MISSING:
+        # Redis lost the key (flush/restart): only plain player tokens that never saw a
+        # role change are safe to accept; the rest log in again, which re-publishes it
+        return token_version > 0 or jwt_payload.get("role") != PLAYER_ROLE
+    return version != token_version
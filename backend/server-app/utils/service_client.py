@@ -0,0 +1,161 @@
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from config import Config
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+RETRY_STATUSES = {502, 503, 504}
+LATENCY_BUCKETS_MS = (10, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failure_threshold` consecutive failures. While open every call
+    fails fast; after `reset_timeout` seconds a single trial call is let through
+    (half-open) and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                self._trial_in_flight = False
+            if self.state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+
+class ServiceClient:
+    """
+    HTTP client for calls to another backend service.
+
+    One pooled keep-alive session per target, separate connect/read timeouts,
+    retries with full-jitter exponential backoff for idempotent calls only (pass
+    idempotent=True for POSTs that are safe to repeat), a circuit breaker and
+    per-endpoint latency metrics (`stats()`).
+    """
+
+    def __init__(self, base_url, connect_timeout=Config.SERVICE_CONNECT_TIMEOUT,
+                 read_timeout=Config.SERVICE_READ_TIMEOUT, max_retries=Config.SERVICE_MAX_RETRIES,
+                 backoff_base=0.1, backoff_max=2.0, pool_size=Config.SERVICE_POOL_SIZE,
+                 failure_threshold=5, reset_timeout=30):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._metrics = {}
+        self._metrics_lock = threading.Lock()
+
+    def _record(self, endpoint, elapsed_ms, ok):
+        with self._metrics_lock:
+            m = self._metrics.setdefault(endpoint, {
+                "requests": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0,
+                "buckets": {str(b): 0 for b in LATENCY_BUCKETS_MS + ("inf",)},
+            })
+            m["requests"] += 1
+            m["errors"] += 0 if ok else 1
+            m["total_ms"] += elapsed_ms
+            m["max_ms"] = max(m["max_ms"], elapsed_ms)
+            bucket = next((str(b) for b in LATENCY_BUCKETS_MS if elapsed_ms <= b), "inf")
+            m["buckets"][bucket] += 1
+
+    def stats(self):
+        with self._metrics_lock:
+            data = {}
+            for endpoint, m in self._metrics.items():
+                data[endpoint] = dict(m, buckets=dict(m["buckets"]),
+                                      avg_ms=m["total_ms"] / m["requests"] if m["requests"] else 0.0)
+        return {"circuit": self.breaker.state, "endpoints": data}
+
+    def _sleep_backoff(self, attempt):
+        time.sleep(random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt))))
+
+    def request(self, method, path, idempotent=None, endpoint=None, **kwargs):
+        method = method.upper()
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        endpoint = endpoint or f"{method} {path}"
+        attempts = 1 + (self.max_retries if idempotent else 0)
+        kwargs.setdefault("timeout", self.timeout)
+
+        for attempt in range(attempts):
+            if not self.breaker.allow():
+                raise CircuitOpenError(f"Circuit open for {self.base_url}")
+
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, f"{self.base_url}{path}", **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                self._record(endpoint, (time.perf_counter() - start) * 1000, ok=False)
+                self.breaker.record_failure()
+                if attempt + 1 < attempts:
+                    self._sleep_backoff(attempt)
+                    continue
+                raise
+            except Exception:
+                # Not retried (ChunkedEncodingError, InvalidURL, ...) but still an outcome,
+                # otherwise a half-open trial would never finish and the circuit stays open
+                self._record(endpoint, (time.perf_counter() - start) * 1000, ok=False)
+                self.breaker.record_failure()
+                raise
+
+            ok = response.status_code < 500
+            self._record(endpoint, (time.perf_counter() - start) * 1000, ok=ok)
+            if ok:
+                self.breaker.record_success()
+                return response
+
+            self.breaker.record_failure()
+            if response.status_code in RETRY_STATUSES and attempt + 1 < attempts:
+                self._sleep_backoff(attempt)
+                continue
+            return response
+
+    def get(self, path, **kwargs):
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request("POST", path, **kwargs)
+
+
+quiz_service = ServiceClient(Config.QUIZ_SERVICE_URL)
@@ -0,0 +1,119 @@
+import hashlib
+import math
+import threading
+import time
+import redis
+from extensions import cache
+from config import Config
+
+# One key per revoked jti (EXISTS is O(1)); each expires together with its token.
+REVOKED_KEY_PREFIX = "revoked_jti:"
+# jti -> exp index, only used to rebuild the optional in-process Bloom filter
+REVOKED_INDEX_KEY = "revoked_jtis"
+# Set once revocations kept outside Redis were copied in; missing after a flush/restart
+REVOKED_SEEDED_KEY = "revoked_jtis:seeded"
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate):
+        self.size = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.hashes = max(1, int(round(self.size / capacity * math.log(2))))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+_bloom = None
+_bloom_built_at = 0.0
+_bloom_lock = threading.Lock()
+
+
+def _refresh_bloom():
+    global _bloom, _bloom_built_at
+    if not _bloom_lock.acquire(blocking=False):
+        return  # another thread is rebuilding, keep using the current filter
+    try:
+        now = time.time()
+        pipe = cache.pipeline()
+        pipe.zremrangebyscore(REVOKED_INDEX_KEY, 0, now)
+        pipe.zrange(REVOKED_INDEX_KEY, 0, -1)
+        _, jtis = pipe.execute()
+
+        bloom = BloomFilter(Config.JWT_REVOCATION_BLOOM_CAPACITY, Config.JWT_REVOCATION_BLOOM_ERROR_RATE)
+        for jti in jtis:
+            bloom.add(jti)
+        _bloom, _bloom_built_at = bloom, now
+    except redis.RedisError as e:
+        print("TOKEN REVOCATION: bloom refresh failed:", e)
+    finally:
+        _bloom_lock.release()
+
+
+def _bloom_says_not_revoked(jti):
+    if time.time() - _bloom_built_at > Config.JWT_REVOCATION_BLOOM_REFRESH_SECONDS:
+        _refresh_bloom()
+    return _bloom is not None and jti not in _bloom
+
+
+def revoke_token(jti, expires_at):
+    """
+    Adds the jti to the revocation set until the token's own expiry (epoch seconds).
+    False if Redis is unavailable; the caller then keeps the revocation elsewhere.
+    """
+    now = time.time()
+    ttl = max(1, int(expires_at - now))
+
+    try:
+        pipe = cache.pipeline()
+        pipe.setex(f"{REVOKED_KEY_PREFIX}{jti}", ttl, 1)
+        pipe.zadd(REVOKED_INDEX_KEY, {jti: expires_at})
+        pipe.zremrangebyscore(REVOKED_INDEX_KEY, 0, now)
+        pipe.execute()
+    except redis.RedisError as e:
+        print("TOKEN REVOCATION: redis unavailable, token not revoked in redis:", e)
+        return False
+
+    if _bloom is not None:
+        _bloom.add(jti)
+    return True
+
+
+def is_seeded():
+    """False if Redis lost its data since revocations were last copied in (or can't be asked)."""
+    try:
+        return cache.exists(REVOKED_SEEDED_KEY) == 1
+    except redis.RedisError:
+        return True
+
+
+def mark_seeded():
+    try:
+        cache.set(REVOKED_SEEDED_KEY, 1)
+    except redis.RedisError as e:
+        print("TOKEN REVOCATION: seeded marker not set:", e)
+
+
+def is_token_revoked(jti, fallback=None):
+    """`fallback(jti)` answers when Redis is unavailable (tokens are accepted without one)."""
+    # Bloom filter can only say "definitely not revoked"; anything else goes to Redis
+    if Config.JWT_REVOCATION_BLOOM and _bloom_says_not_revoked(jti):
+        return False
+    try:
+        return cache.exists(f"{REVOKED_KEY_PREFIX}{jti}") == 1
+    except redis.RedisError as e:
+        if fallback is not None:
+            print("TOKEN REVOCATION: redis unavailable, checking fallback:", e)
+            return fallback(jti)
+        print("TOKEN REVOCATION: redis unavailable, token accepted:", e)
+        return False
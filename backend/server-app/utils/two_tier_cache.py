@@ -0,0 +1,212 @@
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+import redis
+from flask import current_app
+from extensions import cache
+
+
+class TwoTierCache:
+    """
+    Read-through cache: small in-process LRU (L1) in front of Redis (L2).
+
+    - L2 entries carry a soft expiry; after it they are served stale for up to
+      `stale_ttl` seconds while one request refreshes them in the background.
+    - On a miss only one request rebuilds a key: threads of this process wait on a
+      local lock, other processes wait on a Redis lock (SET NX) and poll for the value
+      until it shows up or the lock is released (loader returned None or failed).
+    - `delete` clears this process's L1 and Redis; other processes may serve their
+      L1 copy for up to `l1_ttl` seconds, so keep that short.
+
+    The loader returns the value to cache, or None for "nothing to cache" (e.g. 404).
+    """
+
+    def __init__(self, prefix, ttl, stale_ttl=60, l1_ttl=5, l1_max_size=1024, lock_timeout=5):
+        self.prefix = prefix
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.l1_ttl = l1_ttl
+        self.l1_max_size = l1_max_size
+        self.lock_timeout = lock_timeout
+
+        self._l1 = OrderedDict()
+        self._l1_lock = threading.Lock()
+        # Striped per-key locks, so the lock table doesn't grow with the key space
+        self._key_locks = [threading.Lock() for _ in range(64)]
+        self._metrics_lock = threading.Lock()
+        self._metrics = {
+            "l1_hits": 0, "l2_hits": 0, "stale_hits": 0, "misses": 0,
+            "rebuilds": 0, "rebuild_errors": 0, "lock_waits": 0,
+        }
+
+    # --- metrics ---
+    def _count(self, name):
+        with self._metrics_lock:
+            self._metrics[name] += 1
+
+    def stats(self):
+        with self._metrics_lock:
+            data = dict(self._metrics)
+        data["l1_size"] = len(self._l1)
+        return data
+
+    # --- L1 ---
+    def _l1_get(self, key):
+        with self._l1_lock:
+            entry = self._l1.get(key)
+            if entry is None:
+                return None
+            if entry[1] < time.monotonic():
+                del self._l1[key]
+                return None
+            self._l1.move_to_end(key)
+            return entry[0]
+
+    def _l1_set(self, key, value):
+        with self._l1_lock:
+            self._l1[key] = (value, time.monotonic() + self.l1_ttl)
+            self._l1.move_to_end(key)
+            while len(self._l1) > self.l1_max_size:
+                self._l1.popitem(last=False)
+
+    # --- L2 ---
+    def _redis_key(self, key):
+        return f"{self.prefix}:{key}"
+
+    def _l2_get(self, key):
+        """Returns (value, is_fresh) or (None, False)."""
+        try:
+            raw = cache.get(self._redis_key(key))
+        except redis.RedisError:
+            return None, False
+        if raw is None:
+            return None, False
+        envelope = json.loads(raw)
+        return envelope["v"], envelope["exp"] > time.time()
+
+    def _l2_set(self, key, value):
+        envelope = json.dumps({"v": value, "exp": time.time() + self.ttl})
+        try:
+            cache.setex(self._redis_key(key), self.ttl + self.stale_ttl, envelope)
+        except redis.RedisError as e:
+            print("CACHE: redis unavailable, value not stored:", e)
+
+    def _lock_key(self, key):
+        return f"{self._redis_key(key)}:lock"
+
+    def _acquire_remote_lock(self, key):
+        token = uuid.uuid4().hex
+        try:
+            if cache.set(self._lock_key(key), token, nx=True, ex=self.lock_timeout):
+                return token
+            return None
+        except redis.RedisError:
+            return token  # no Redis -> no cross-process coordination, just rebuild
+
+    def _release_remote_lock(self, key, token):
+        lock_key = self._lock_key(key)
+        try:
+            if cache.get(lock_key) == token:
+                cache.delete(lock_key)
+        except redis.RedisError:
+            pass
+
+    def _local_lock(self, key):
+        return self._key_locks[hash(key) % len(self._key_locks)]
+
+    # --- rebuild ---
+    def _rebuild(self, key, loader):
+        self._count("rebuilds")
+        try:
+            value = loader()
+        except Exception:
+            self._count("rebuild_errors")
+            raise
+        if value is not None:
+            self._l2_set(key, value)
+            self._l1_set(key, value)
+        return value
+
+    def _revalidate_in_background(self, key, loader):
+        token = self._acquire_remote_lock(key)
+        if token is None:
+            return  # someone else is already refreshing it
+        app = current_app._get_current_object()
+
+        def run():
+            with app.app_context():
+                try:
+                    self._rebuild(key, loader)
+                except Exception as e:
+                    print("CACHE: background refresh failed:", key, e)
+                finally:
+                    self._release_remote_lock(key, token)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def _wait_for_remote(self, key):
+        """Value stored by the lock holder; None once the lock is gone without one, or on timeout."""
+        self._count("lock_waits")
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            try:
+                pipe = cache.pipeline(transaction=False)
+                pipe.get(self._redis_key(key))
+                pipe.exists(self._lock_key(key))
+                raw, locked = pipe.execute()
+            except redis.RedisError:
+                return None
+            if raw is not None:
+                return json.loads(raw)["v"]
+            if not locked:
+                return None  # holder had nothing to cache (e.g. 404) or failed
+        return None
+
+    # --- public API ---
+    def get_or_load(self, key, loader):
+        key = str(key)
+        value = self._l1_get(key)
+        if value is not None:
+            self._count("l1_hits")
+            return value
+
+        value, fresh = self._l2_get(key)
+        if value is not None:
+            if fresh:
+                self._count("l2_hits")
+                self._l1_set(key, value)
+            else:
+                self._count("stale_hits")
+                self._revalidate_in_background(key, loader)
+            return value
+
+        self._count("misses")
+        with self._local_lock(key):
+            # Another thread of this process may have rebuilt it while we waited
+            value = self._l1_get(key)
+            if value is not None:
+                return value
+
+            token = self._acquire_remote_lock(key)
+            if token is None:
+                value = self._wait_for_remote(key)
+                if value is not None:
+                    self._l1_set(key, value)
+                    return value
+                return self._rebuild(key, loader)
+            try:
+                return self._rebuild(key, loader)
+            finally:
+                self._release_remote_lock(key, token)
+
+    def delete(self, key):
+        key = str(key)
+        with self._l1_lock:
+            self._l1.pop(key, None)
+        try:
+            cache.delete(self._redis_key(key))
+        except redis.RedisError as e:
+            print("CACHE: redis unavailable, key not invalidated:", e)
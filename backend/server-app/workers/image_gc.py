@@ -0,0 +1,71 @@
+"""
+Removes profile images that no User.profile_image references any more.
+
+    cd server-app && python -m workers.image_gc [--dry-run]
+"""
+import os
+import time
+
+from repo.user_repo import UserRepository
+from services.image_service import ImageService
+
+
+def collect_orphans(upload_dir, referenced, grace_seconds):
+    """Yields paths of stored files whose image is referenced by no user and that are older than the grace period."""
+    cutoff = time.time() - grace_seconds
+    for root, _dirs, files in os.walk(upload_dir):
+        for filename in files:
+            path = os.path.join(root, filename)
+            try:
+                if os.path.getmtime(path) > cutoff:
+                    continue
+            except FileNotFoundError:
+                continue
+
+            # Leftovers of interrupted uploads/thumbnailing
+            if filename.endswith(".tmp"):
+                yield path
+            elif ImageService.image_name(filename) not in referenced:
+                yield path
+
+
+def run_image_gc(dry_run=False):
+    # import inside to avoid circular import
+    from app import create_app
+
+    app = create_app()
+    with app.app_context():
+        upload_dir = app.config.get('UPLOAD_FOLDER', 'static/uploads/profiles')
+        if not os.path.isdir(upload_dir):
+            print("IMAGE GC: upload folder does not exist:", upload_dir)
+            return
+
+        referenced = UserRepository.get_referenced_profile_images()
+        grace = app.config.get('PROFILE_IMAGE_GC_GRACE_SECONDS', 3600)
+
+        removed = 0
+        for path in collect_orphans(upload_dir, referenced, grace):
+            if dry_run:
+                print("IMAGE GC (dry run):", path)
+            else:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    continue
+            removed += 1
+
+        # Drop shard directories that became empty
+        if not dry_run:
+            for root, dirs, files in os.walk(upload_dir, topdown=False):
+                if root != upload_dir and not dirs and not files:
+                    try:
+                        os.rmdir(root)
+                    except OSError:
+                        pass
+
+        print(f"IMAGE GC DONE: {removed} file(s) {'would be ' if dry_run else ''}removed, {len(referenced)} image(s) referenced")
+
+
+if __name__ == "__main__":
+    import sys
+    run_image_gc(dry_run="--dry-run" in sys.argv)
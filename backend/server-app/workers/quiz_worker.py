@@ -1,11 +1,8 @@
-import os
-import time
 import requests
 
 from services.mail_service import send_results_email
 from repo.user_repo import UserRepository
-
-QUIZ_SERVICE_URL = os.getenv("QUIZ_SERVICE_URL", "http://127.0.0.1:5000")
+from utils.service_client import quiz_service, CircuitOpenError
 
 
 def process_quiz_attempt(user_id: int, quiz_id: int, attempt_id: str, time_spent_seconds: int, answers_payload: list):
@@ -21,16 +18,23 @@ def process_quiz_attempt(user_id: int, quiz_id: int, attempt_id: str, time_spent
             return
 
         # 2) pozovi service-app obradu
-        r = requests.post(
-            f"{QUIZ_SERVICE_URL}/api/quizzes/{quiz_id}/process",
-            json={
-                "user_id": user_id,
-                "user_email": user.email,
-                "time_spent_seconds": time_spent_seconds,
-                "answers": answers_payload
-            },
-            timeout=60
-        )
+        try:
+            r = quiz_service.post(
+                f"/api/quizzes/{quiz_id}/process",
+                endpoint="POST /api/quizzes/<id>/process",
+                # service-app stores each attempt_id once, so retrying is safe
+                idempotent=True,
+                json={
+                    "attempt_id": attempt_id,
+                    "user_id": user_id,
+                    "user_email": user.email,
+                    "time_spent_seconds": time_spent_seconds,
+                    "answers": answers_payload
+                }
+            )
+        except (CircuitOpenError, requests.RequestException) as e:
+            print("PROCESS ERROR:", attempt_id, e)
+            return
 
         if r.status_code != 200:
             print("PROCESS ERROR:", r.status_code, r.text)
@@ -3,10 +3,18 @@ from flask_cors import CORS
 from extensions import db, migrate, jwt, socketio, mail
 from routes.quiz_routes import quiz_bp
 from routes.question_routes import question_bp
+from routes.ranking_routes import ranking_bp
+from routes.result_routes import result_bp
+from commands import register_commands
+from utils.token_revocation import is_token_revoked
+from utils.role_version import is_role_stale
+from utils.compression import init_compression
+from utils.json_provider import init_json
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object('config.Config')
+    init_json(app)
     
     # Initialize CORS
     CORS(app, 
@@ -21,6 +29,11 @@ def create_app():
     jwt.init_app(app)
     mail.init_app(app)
     migrate.init_app(app, db)
+
+    # Logged-out tokens and tokens issued before a role change/deletion are rejected here as well
+    @jwt.token_in_blocklist_loader
+    def check_if_token_revoked(jwt_header, jwt_payload):
+        return is_token_revoked(jwt_payload["jti"]) or is_role_stale(jwt_payload)
     
     # Initialize Socket.IO last
     socketio.init_app(app, 
@@ -33,6 +46,11 @@ def create_app():
     # Register blueprints
     app.register_blueprint(quiz_bp, url_prefix="/api")
     app.register_blueprint(question_bp, url_prefix="/api")
+    app.register_blueprint(ranking_bp, url_prefix="/api")
+    app.register_blueprint(result_bp, url_prefix="/api")
+
+    register_commands(app)
+    init_compression(app)
     
     # Import socket handlers to register them
     try:
@@ -0,0 +1,77 @@
+"""
+Bytes on the wire and CPU per request for a /quizzes/<id>/full sized payload.
+
+    python benchmarks/compression_bench.py [questions] [requests]
+
+Builds the JSON of a quiz with `questions` questions (4 answers each), then for
+identity, gzip levels and brotli qualities reports the compressed size and the
+compression time per request, both when compressing every time and when served
+from utils.compression's ETag-keyed cache.
+"""
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.compression import CompressedCache, brotli, compress
+
+
+def quiz_payload(questions):
+    return {
+        "id": 1,
+        "title": "Benchmark quiz",
+        "description": "Opšte znanje, " * 10,
+        "status": "APPROVED",
+        "duration_seconds": 600,
+        "questions": [{
+            "id": q,
+            "text": f"Pitanje broj {q}: koji od ponuđenih odgovora je tačan za ovaj primer?",
+            "points": 1 + q % 3,
+            "answers": [
+                {"id": q * 4 + a, "text": f"Odgovor {a} na pitanje {q}", "is_correct": a == q % 4}
+                for a in range(4)
+            ]
+        } for q in range(1, questions + 1)]
+    }
+
+
+def per_request_ms(fn, requests):
+    start = time.process_time()
+    for _ in range(requests):
+        fn()
+    return (time.process_time() - start) * 1000 / requests
+
+
+def main():
+    questions = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    data = json.dumps(quiz_payload(questions)).encode("utf-8")
+
+    variants = [("gzip", {"gzip_level": level}) for level in (1, 6, 9)]
+    if brotli is not None:
+        variants += [("br", {"brotli_quality": quality}) for quality in (4, 5, 11)]
+    else:
+        print("(brotli not installed, gzip only)")
+
+    print(f"payload: {questions} questions, {len(data)} bytes identity, {requests} requests per row")
+    print(f"{'encoding':<12}{'bytes':>10}{'ratio':>8}{'cpu ms/req':>13}{'cached ms/req':>15}")
+    for encoding, options in variants:
+        body = compress(data, encoding, **options)
+        cold = per_request_ms(lambda: compress(data, encoding, **options), requests)
+
+        cache = CompressedCache(64 * 1024 * 1024)
+        key = ("etag", encoding)
+
+        def cached():
+            if cache.get(key) is None:
+                cache.put(key, compress(data, encoding, **options))
+
+        warm = per_request_ms(cached, requests)
+        label = f"{encoding}-{next(iter(options.values()))}"
+        print(f"{label:<12}{len(body):>10}{len(data) / len(body):>8.1f}{cold:>13.3f}{warm:>15.4f}")
+
+
+if __name__ == "__main__":
+    main()
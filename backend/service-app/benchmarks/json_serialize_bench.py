@@ -0,0 +1,85 @@
+"""
+Serializing the quiz list (GET /quizzes) for many quizzes, ORM vs Core rows.
+
+    python benchmarks/json_serialize_bench.py [quizzes] [rounds]
+
+Fills an in-memory SQLite database with `quizzes` quizzes and times, per round
+(best of `rounds`), loading them and producing the JSON body:
+  - orm + to_dict + stdlib json (the previous path)
+  - orm + to_dict + orjson
+  - core rows + dto.row_serializers + orjson (the current path)
+"""
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from flask import Flask
+from sqlalchemy import insert
+from extensions import db
+from models.quiz import Quiz
+from repo.quiz_repo import QuizRepository
+from dto.row_serializers import quiz_summaries
+from utils.json_provider import IsoJSONProvider, OrjsonProvider, orjson
+
+
+def best_ms(fn, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        db.session.expunge_all()
+        start = time.perf_counter()
+        body = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, len(body)
+
+
+def main():
+    quizzes = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        now = datetime.now(timezone.utc)
+        db.session.execute(insert(Quiz), [{
+            "title": f"Kviz {i}", "description": "Opis kviza", "status": "APPROVED", "duration_seconds": 300,
+            "author_id": i % 50, "question_count": 20, "total_points": 30, "attempt_count": i % 200,
+            "score_sum": (i % 200) * 17, "best_score": 30 if i % 200 else None, "created_at": now, "updated_at": now
+        } for i in range(quizzes)])
+        db.session.commit()
+
+        stdlib = IsoJSONProvider(app)
+        paths = [
+            ("orm + to_dict + stdlib json",
+             lambda: stdlib.dumps([q.to_dict(include_questions=False) for q in Quiz.query.all()]).encode()),
+        ]
+        if orjson is not None:
+            fast = OrjsonProvider(app)
+            paths += [
+                ("orm + to_dict + orjson",
+                 lambda: fast.response([q.to_dict(include_questions=False) for q in Quiz.query.all()]).get_data()),
+                ("core rows + serializer + orjson",
+                 lambda: fast.response(quiz_summaries(QuizRepository.get_quiz_summary_rows())).get_data()),
+            ]
+        else:
+            print("(orjson not installed, stdlib only)")
+
+        print(f"{quizzes} quizzes, best of {rounds} rounds")
+        baseline = None
+        for label, fn in paths:
+            ms, size = best_ms(fn, rounds)
+            baseline = baseline or ms
+            print(f"{label:<34}{ms:>9.1f} ms{baseline / ms:>7.1f}x  {size} bytes")
+
+        # Same document either way
+        assert json.loads(paths[0][1]()) == json.loads(paths[-1][1]())
+
+
+if __name__ == "__main__":
+    main()
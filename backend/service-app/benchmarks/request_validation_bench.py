@@ -0,0 +1,110 @@
+"""
+Request parsing/validation cost for the quiz submission and bulk authoring bodies.
+
+    python benchmarks/request_validation_bench.py [questions] [iterations]
+
+Compares, per request, the previous path (json.loads, then dict.get/int() checks
+in comprehensions) with the msgspec decoders in dto/request_dto.py, for a
+valid body with `questions` questions and for one that is malformed at the end.
+"""
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from dto.request_dto import BulkQuestions, QuizSubmission, decode_request
+
+
+def legacy_submission(body):
+    # What process_quiz + AttemptService did before the structs
+    payload = json.loads(body) or {}
+    answers = payload.get("answers")
+    if not isinstance(answers, list):
+        raise ValueError("Invalid payload")
+    try:
+        return {
+            int(item["question_id"]): sorted(set(int(x) for x in item.get("answer_ids", [])))
+            for item in answers if item.get("question_id") is not None
+        }
+    except (TypeError, ValueError, AttributeError):
+        raise ValueError("Invalid payload")
+
+
+def legacy_bulk(body):
+    # What QuizService.add_questions_bulk checked before the structs
+    items = (json.loads(body) or {}).get("questions")
+    if not isinstance(items, list) or not items:
+        raise ValueError("questions must be a non-empty list")
+    parsed = []
+    for i, item in enumerate(items, start=1):
+        if not isinstance(item, dict) or not str(item.get("text") or "").strip():
+            raise ValueError(f"Question #{i} has no text")
+        answers = item.get("answers") or []
+        if not isinstance(answers, list) or any(not isinstance(a, dict) or not str(a.get("text") or "").strip() for a in answers):
+            raise ValueError(f"Question #{i} has an invalid answer")
+        try:
+            points = int(item.get("points", 1))
+        except (TypeError, ValueError):
+            raise ValueError(f"Question #{i} has invalid points")
+        parsed.append((item["text"], points, [(a["text"], bool(a.get("is_correct", False))) for a in answers]))
+    return parsed
+
+
+def current_submission(body):
+    submission = decode_request(QuizSubmission, body)
+    return {item.question_id: sorted(set(item.answer_ids)) for item in submission.answers}
+
+
+def current_bulk(body):
+    return decode_request(BulkQuestions, body).questions
+
+
+def us_per_call(fn, body, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        try:
+            fn(body)
+        except ValueError:
+            pass
+    return (time.perf_counter() - start) * 1_000_000 / iterations
+
+
+def main():
+    questions = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+    submission = {
+        "attempt_id": "6f1c0a6e2b8d4c7f9e3a5b1d0c2e4f6a",
+        "time_spent_seconds": 512,
+        "answers": [{"question_id": q, "answer_ids": [q * 4 + 1, q * 4 + 3]} for q in range(1, questions + 1)],
+    }
+    bulk = {"questions": [{
+        "text": f"Pitanje {q}?", "points": 1 + q % 3,
+        "answers": [{"text": f"Odgovor {a}", "is_correct": a == 0} for a in range(4)],
+    } for q in range(questions)]}
+
+    bad_submission = json.loads(json.dumps(submission))
+    bad_submission["answers"][-1]["answer_ids"] = ["x"]
+    bad_bulk = json.loads(json.dumps(bulk))
+    bad_bulk["questions"][-1]["points"] = "x"
+
+    cases = [
+        ("submission", legacy_submission, current_submission, submission),
+        ("submission (bad)", legacy_submission, current_submission, bad_submission),
+        ("bulk authoring", legacy_bulk, current_bulk, bulk),
+        ("bulk authoring (bad)", legacy_bulk, current_bulk, bad_bulk),
+    ]
+
+    print(f"{questions} questions per body, {iterations} iterations")
+    print(f"{'payload':<22}{'bytes':>8}{'legacy us':>12}{'msgspec us':>12}{'speedup':>9}")
+    for label, legacy, current, payload in cases:
+        body = json.dumps(payload).encode("utf-8")
+        old = us_per_call(legacy, body, iterations)
+        new = us_per_call(current, body, iterations)
+        print(f"{label:<22}{len(body):>8}{old:>12.1f}{new:>12.1f}{old / new:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
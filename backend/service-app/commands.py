@@ -0,0 +1,36 @@
+import click
+from services.ranking_service import RankingService
+from services.quiz_stats_service import QuizStatsService
+from services.result_writer import ResultWriter
+from models.quiz import Quiz
+from repo.quiz_repo import QuizRepository
+
+
+def register_commands(app):
+
+    @app.cli.command("rebuild-rankings")
+    def rebuild_rankings():
+        """Recomputes global_rankings and the Redis ranking from quiz_best_results."""
+        count = RankingService.reconcile()
+        click.echo(f"Global ranking rebuilt for {count} player(s)")
+
+    @app.cli.command("repair-quiz-counters")
+    def repair_quiz_counters():
+        """Recomputes the denormalized Quiz counters from questions and quiz_results."""
+        count = QuizRepository.repair_quiz_counters()
+        click.echo(f"Quiz counters repaired for {count} quiz(zes)")
+
+    @app.cli.command("rebuild-quiz-stats")
+    @click.argument("quiz_id", type=int, required=False)
+    def rebuild_quiz_stats(quiz_id):
+        """Recomputes the Redis score histogram/percentiles of one quiz, or of all quizzes."""
+        quiz_ids = [quiz_id] if quiz_id else [qid for (qid,) in Quiz.query.with_entities(Quiz.id)]
+        for qid in quiz_ids:
+            count = QuizStatsService.rebuild(qid)
+            click.echo(f"Quiz {qid}: {count} result(s)")
+
+    @app.cli.command("requeue-dead-results")
+    def requeue_dead_results():
+        """Puts results the write-behind queue could not store back into the queue."""
+        count = ResultWriter.requeue_dead_letters()
+        click.echo(f"Re-queued {count} result(s)")
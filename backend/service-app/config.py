@@ -15,6 +15,51 @@ class Config:
     JWT_COOKIE_SECURE = False       
     JWT_COOKIE_SAMESITE = 'Lax'
 
+    # Logout revocation list in Redis. The optional in-process Bloom filter skips the Redis
+    # lookup for tokens that were never revoked; tokens revoked by another process are only
+    # seen after the next refresh, so keep the refresh interval short.
+    JWT_REVOCATION_BLOOM = os.getenv("JWT_REVOCATION_BLOOM", "false").lower() == "true"
+    JWT_REVOCATION_BLOOM_REFRESH_SECONDS = int(os.getenv("JWT_REVOCATION_BLOOM_REFRESH_SECONDS", 5))
+    JWT_REVOCATION_BLOOM_CAPACITY = 100_000
+    JWT_REVOCATION_BLOOM_ERROR_RATE = 0.01
+    # How long a user's role version is cached in-process before asking Redis again
+    ROLE_VERSION_CACHE_SECONDS = float(os.getenv("ROLE_VERSION_CACHE_SECONDS", 2))
+
+    REDIS_HOST = os.getenv("REDIS_HOST", "redis")
+    REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
+
+    # Idempotent /process: how long an attempt stays locked while scored, and how long its result is replayed
+    ATTEMPT_PROCESSING_TTL_SECONDS = int(os.getenv("ATTEMPT_PROCESSING_TTL_SECONDS", 60))
+    ATTEMPT_RESULT_TTL_SECONDS = int(os.getenv("ATTEMPT_RESULT_TTL_SECONDS", 24 * 3600))
+    # Timed attempts (POST /quizzes/<id>/start): late network/auto-submit allowance, and whether
+    # /process accepts attempts without a started session (client-reported time)
+    ATTEMPT_GRACE_SECONDS = int(os.getenv("ATTEMPT_GRACE_SECONDS", 5))
+    ATTEMPT_SESSION_EXTRA_TTL_SECONDS = 300
+    ATTEMPT_REQUIRE_SESSION = os.getenv("ATTEMPT_REQUIRE_SESSION", "true").lower() == "true"
+
+    # Write-behind for QuizResult inserts (services/result_writer.py)
+    RESULT_WRITE_BEHIND = os.getenv("RESULT_WRITE_BEHIND", "true").lower() == "true"
+    RESULT_BATCH_SIZE = int(os.getenv("RESULT_BATCH_SIZE", 500))
+    RESULT_FLUSH_INTERVAL_MS = int(os.getenv("RESULT_FLUSH_INTERVAL_MS", 50))
+    # Failed flushes of the same batch before it is stored row by row and bad rows dead-lettered
+    RESULT_MAX_RETRIES = int(os.getenv("RESULT_MAX_RETRIES", 8))
+
+    # Global ranking: full rebuild from quiz_best_results (repairs the incremental Redis totals)
+    RANKING_RECONCILE_SECONDS = int(os.getenv("RANKING_RECONCILE_SECONDS", 600))
+    RANKING_MAX_LIMIT = 100
+    RESULT_HISTORY_MAX_LIMIT = 100
+    # Per-quiz score distribution (services/quiz_stats_service.py)
+    QUIZ_STATS_BUCKETS = 10
+    QUIZ_STATS_DIGEST_BUFFER = int(os.getenv("QUIZ_STATS_DIGEST_BUFFER", 64))
+
+    # Response compression (utils/compression.py); brotli is used when installed and accepted
+    COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", 1024))
+    COMPRESS_GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", 6))
+    COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", 5))
+    COMPRESS_CACHE_BYTES = int(os.getenv("COMPRESS_CACHE_BYTES", 32 * 1024 * 1024))
+    # "orjson" (utils/json_provider.py, when installed) or "default" (stdlib json)
+    JSON_PROVIDER = os.getenv("JSON_PROVIDER", "orjson")
+
     UPLOAD_FOLDER = os.path.join(os.path.abspath(os.path.dirname(__file__)), 'static/uploads')
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  
 
@@ -1,22 +1,57 @@
-# Quiz Submission (When a user finishes a quiz)
-# Expected JSON: {"quiz_id": 1, "answers": [{"question_id": 10, "answer_id": 42}, ...]}
-class QuizSubmissionDTO:
-    def __init__(self, data):
-        self.quiz_id = data.get('quiz_id')
-        self.answers = data.get('answers', []) 
-        # answers format: [{"question_id": 1, "answer_id": 10}, {"question_id": 2, "answer_id": 15}]
-
-    def is_valid(self):
-        return self.quiz_id is not None and isinstance(self.answers, list)
-
-class QuizCreateDTO:
-    def __init__(self, data):
-        self.title = data.get('title')
-        self.description = data.get('description')
-        self.questions = data.get('questions', []) 
-        # questions format: [{"text": "Pitanje?", "answers": [{"text": "Odg", "is_correct": True}, ...]}, ...]
-
-    def validate(self):
-        if not self.title or len(self.questions) == 0:
-            return False
-        return True
+from typing import Annotated
+import msgspec
+from msgspec import Meta
+
+# Request bodies of the hot write endpoints, decoded straight from the raw JSON bytes by
+# decoders compiled once at import. Anything that doesn't match (wrong types, missing
+# fields, blank texts) is rejected with a ValueError before the route touches the DB.
+
+NonBlank = Annotated[str, Meta(pattern=r"\S")]
+Id = Annotated[int, Meta(ge=1)]
+
+
+class AnswerSelection(msgspec.Struct):
+    question_id: Id
+    answer_ids: list[Id] = []
+
+
+# POST /quizzes/<id>/process
+class QuizSubmission(msgspec.Struct):
+    answers: list[AnswerSelection]
+    attempt_id: Annotated[str, Meta(min_length=1, max_length=64)] | None = None
+    time_spent_seconds: Annotated[int, Meta(ge=0)] | None = None
+
+
+# PUT /attempts/<attempt_id>/answers
+class AnswersAutosave(msgspec.Struct):
+    answers: list[AnswerSelection]
+
+
+class BulkAnswer(msgspec.Struct):
+    text: Annotated[str, Meta(pattern=r"\S", max_length=255)]
+    is_correct: bool = False
+
+
+class BulkQuestion(msgspec.Struct):
+    text: NonBlank
+    points: Annotated[int, Meta(ge=0)] = 1
+    answers: list[BulkAnswer] = []
+
+
+# POST /quizzes/<id>/questions/bulk
+class BulkQuestions(msgspec.Struct):
+    questions: Annotated[list[BulkQuestion], Meta(min_length=1)]
+
+
+_DECODERS = {
+    struct_type: msgspec.json.Decoder(struct_type)
+    for struct_type in (QuizSubmission, AnswersAutosave, BulkQuestions)
+}
+
+
+def decode_request(struct_type, body):
+    """Raw request bytes -> struct_type instance; ValueError with the offending path otherwise."""
+    try:
+        return _DECODERS[struct_type].decode(body)
+    except (msgspec.ValidationError, msgspec.DecodeError) as e:
+        raise ValueError(f"Invalid payload: {e}")
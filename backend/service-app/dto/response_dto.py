@@ -17,17 +17,19 @@ class QuizResponseDTO:
         self.questions = [QuestionResponseDTO(q).__dict__ for q in quiz.questions]
 
 class RankingResponseDTO:
-    def __init__(self, ranking):
-        self.id = ranking.id
+    def __init__(self, ranking, rank=None):
+        self.rank = rank
         self.user_id = ranking.user_id
-        # Pristupamo User modelu preko relacije koju smo definirali
-        self.full_name = f"{ranking.user.first_name} {ranking.user.last_name}"
+        # DB2 nema users tabelu, pa se igrac prikazuje preko email snapshot-a
+        self.user_email = ranking.user_email
         self.total_score = ranking.total_score
         self.quizzes_completed = ranking.quizzes_completed
 
     def to_dict(self):
         return {
-            "full_name": self.full_name,
+            "rank": self.rank,
+            "user_id": self.user_id,
+            "user_email": self.user_email,
             "total_score": self.total_score,
             "quizzes_completed": self.quizzes_completed
         }
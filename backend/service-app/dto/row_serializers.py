@@ -0,0 +1,45 @@
+# Row-tuple -> JSON-ready structures for read endpoints. They work on the Core rows of
+# QuizRepository (no ORM hydration) and leave datetimes as they are; the app's JSON
+# provider encodes them as ISO 8601.
+
+
+def quiz_summaries(rows):
+    """Quiz.to_dict(include_questions=False) shape for QuizRepository.get_quiz_summary_rows rows."""
+    return [
+        {
+            "id": quiz_id,
+            "title": title,
+            "status": status,
+            "duration_seconds": duration_seconds,
+            "author_id": author_id,
+            "rejection_reason": reject_reason,
+            "question_count": question_count,
+            "total_points": total_points,
+            "attempt_count": attempt_count,
+            "average_score": round(score_sum / attempt_count, 2) if attempt_count else None,
+            "best_score": best_score,
+            "created_at": created_at,
+            "updated_at": updated_at,
+        }
+        for (quiz_id, title, status, duration_seconds, author_id, reject_reason, question_count,
+             total_points, attempt_count, score_sum, best_score, created_at, updated_at, _description) in rows
+    ]
+
+
+def questions_by_quiz(rows, include_correct=True):
+    """{quiz_id: [question, ...]} from QuizRepository.get_question_rows rows (same include_correct)."""
+    by_quiz = {}
+    question = None
+    last_question_id = None
+    for row in rows:
+        quiz_id, question_id, text, points, answer_id, answer_text = row[:6]
+        if question_id != last_question_id:
+            question = {"id": question_id, "text": text, "points": points, "answers": []}
+            by_quiz.setdefault(quiz_id, []).append(question)
+            last_question_id = question_id
+        if answer_id is not None:
+            if include_correct:
+                question["answers"].append({"id": answer_id, "text": answer_text, "is_correct": row[6]})
+            else:
+                question["answers"].append({"id": answer_id, "text": answer_text})
+    return by_quiz
@@ -3,10 +3,12 @@ from flask_jwt_extended import JWTManager
 from flask_migrate import Migrate
 from flask_mail import Mail
 from flask_socketio import SocketIO
+from config import Config
+import redis
 
 db = SQLAlchemy()
 migrate = Migrate()
 jwt = JWTManager()
 mail = Mail()
 socketio = SocketIO(cors_allowed_origins="*", async_mode="eventlet", manage_session=False)
-
+cache = redis.Redis(host=Config.REDIS_HOST, port=Config.REDIS_PORT, db=0, decode_responses=True)
@@ -0,0 +1,28 @@
+"""leaderboard index tie-break on result_id
+
+Revision ID: 0a9c5e2f7b36
+Revises: f06b2d4c8e71
+Create Date: 2026-10-19 15:48:09.215364
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0a9c5e2f7b36'
+down_revision = 'f06b2d4c8e71'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.drop_index('ix_quiz_best_results_rank', table_name='quiz_best_results')
+    op.create_index('ix_quiz_best_results_rank', 'quiz_best_results',
+                    ['quiz_id', sa.text('score DESC'), 'time_spent_seconds', 'completed_at', 'result_id'])
+
+
+def downgrade():
+    op.drop_index('ix_quiz_best_results_rank', table_name='quiz_best_results')
+    op.create_index('ix_quiz_best_results_rank', 'quiz_best_results',
+                    ['quiz_id', sa.text('score DESC'), 'time_spent_seconds', 'completed_at'])
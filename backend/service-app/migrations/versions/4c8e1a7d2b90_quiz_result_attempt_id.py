@@ -0,0 +1,34 @@
+"""quiz result attempt_id
+
+Revision ID: 4c8e1a7d2b90
+Revises: 9efc23ec9ca9
+Create Date: 2026-10-19 10:12:44.318206
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4c8e1a7d2b90'
+down_revision = '9efc23ec9ca9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('quiz_results', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('attempt_id', sa.String(length=64), nullable=True))
+
+    # Filtered unique index: older rows have no attempt_id
+    op.create_index(
+        'ux_quiz_results_attempt_id', 'quiz_results', ['attempt_id'], unique=True,
+        mssql_where=sa.text('attempt_id IS NOT NULL'),
+        sqlite_where=sa.text('attempt_id IS NOT NULL')
+    )
+
+
+def downgrade():
+    op.drop_index('ux_quiz_results_attempt_id', table_name='quiz_results')
+    with op.batch_alter_table('quiz_results', schema=None) as batch_op:
+        batch_op.drop_column('attempt_id')
@@ -0,0 +1,29 @@
+"""quiz player payload
+
+Revision ID: 5b8d3f1a9c42
+Revises: 0a9c5e2f7b36
+Create Date: 2026-10-19 16:05:41.338127
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b8d3f1a9c42'
+down_revision = '0a9c5e2f7b36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Filled on approval, or on the first play fetch of quizzes approved earlier
+    with op.batch_alter_table('quizzes', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('player_payload', sa.LargeBinary(), nullable=True))
+        batch_op.add_column(sa.Column('payload_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('quizzes', schema=None) as batch_op:
+        batch_op.drop_column('payload_hash')
+        batch_op.drop_column('player_payload')
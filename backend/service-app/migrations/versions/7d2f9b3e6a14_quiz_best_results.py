@@ -0,0 +1,51 @@
+"""quiz best results
+
+Revision ID: 7d2f9b3e6a14
+Revises: 4c8e1a7d2b90
+Create Date: 2026-10-19 11:40:03.512877
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d2f9b3e6a14'
+down_revision = '4c8e1a7d2b90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('quiz_best_results',
+    sa.Column('quiz_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('user_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('user_email', sa.String(length=255), nullable=True),
+    sa.Column('result_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Integer(), nullable=False),
+    sa.Column('time_spent_seconds', sa.Integer(), nullable=True),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['quiz_id'], ['quizzes.id'], ),
+    sa.PrimaryKeyConstraint('quiz_id', 'user_id')
+    )
+    op.create_index('ix_quiz_best_results_rank', 'quiz_best_results',
+                    ['quiz_id', sa.text('score DESC'), 'time_spent_seconds', 'completed_at'])
+
+    # Backfill: each player's best existing attempt (same order as the leaderboard)
+    op.execute("""
+        INSERT INTO quiz_best_results (quiz_id, user_id, user_email, result_id, score, time_spent_seconds, completed_at)
+        SELECT quiz_id, user_id, user_email, id, score, time_spent_seconds, completed_at
+        FROM (
+            SELECT r.*, ROW_NUMBER() OVER (
+                PARTITION BY r.quiz_id, r.user_id
+                ORDER BY r.score DESC, COALESCE(r.time_spent_seconds, 2147483647) ASC, r.completed_at ASC, r.id ASC
+            ) AS rn
+            FROM quiz_results r
+        ) ranked
+        WHERE rn = 1
+    """)
+
+
+def downgrade():
+    op.drop_index('ix_quiz_best_results_rank', table_name='quiz_best_results')
+    op.drop_table('quiz_best_results')
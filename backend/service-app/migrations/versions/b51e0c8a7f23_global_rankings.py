@@ -0,0 +1,43 @@
+"""global rankings
+
+Revision ID: b51e0c8a7f23
+Revises: 7d2f9b3e6a14
+Create Date: 2026-10-19 13:05:51.027334
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b51e0c8a7f23'
+down_revision = '7d2f9b3e6a14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('global_rankings',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('user_email', sa.String(length=255), nullable=True),
+    sa.Column('total_score', sa.Integer(), nullable=False),
+    sa.Column('quizzes_completed', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id')
+    )
+    op.create_index('ix_global_rankings_total_score', 'global_rankings', [sa.text('total_score DESC')])
+
+    # Initial totals; Redis is filled by the first reconcile (or `flask rebuild-rankings`)
+    op.execute("""
+        INSERT INTO global_rankings (user_id, user_email, total_score, quizzes_completed)
+        SELECT user_id, MAX(user_email), SUM(score), COUNT(*)
+        FROM quiz_best_results
+        GROUP BY user_id
+    """)
+
+
+def downgrade():
+    op.drop_index('ix_global_rankings_total_score', table_name='global_rankings')
+    op.drop_table('global_rankings')
@@ -0,0 +1,26 @@
+"""quiz content version
+
+Revision ID: c27e4a9d1f65
+Revises: 5b8d3f1a9c42
+Create Date: 2026-10-19 16:31:12.604985
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c27e4a9d1f65'
+down_revision = '5b8d3f1a9c42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('quizzes', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('quizzes', schema=None) as batch_op:
+        batch_op.drop_column('content_version')
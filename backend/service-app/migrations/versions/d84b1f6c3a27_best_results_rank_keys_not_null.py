@@ -0,0 +1,42 @@
+"""best results rank keys not null
+
+Revision ID: d84b1f6c3a27
+Revises: c27e4a9d1f65
+Create Date: 2026-10-19 18:02:41.337190
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd84b1f6c3a27'
+down_revision = 'c27e4a9d1f65'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Missing values get the sentinels QuizRepository stores (NO_TIME, NO_COMPLETED_AT), so the
+    # leaderboard can order and seek on the raw indexed columns
+    op.execute("UPDATE quiz_best_results SET time_spent_seconds = 2147483647 WHERE time_spent_seconds IS NULL")
+    op.execute("UPDATE quiz_best_results SET completed_at = '1900-01-01' WHERE completed_at IS NULL")
+
+    op.drop_index('ix_quiz_best_results_rank', table_name='quiz_best_results')
+    with op.batch_alter_table('quiz_best_results', schema=None) as batch_op:
+        batch_op.alter_column('time_spent_seconds', existing_type=sa.Integer(), nullable=False)
+        batch_op.alter_column('completed_at', existing_type=sa.DateTime(), nullable=False)
+    op.create_index('ix_quiz_best_results_rank', 'quiz_best_results',
+                    ['quiz_id', sa.text('score DESC'), 'time_spent_seconds', 'completed_at', 'result_id'])
+
+
+def downgrade():
+    op.drop_index('ix_quiz_best_results_rank', table_name='quiz_best_results')
+    with op.batch_alter_table('quiz_best_results', schema=None) as batch_op:
+        batch_op.alter_column('time_spent_seconds', existing_type=sa.Integer(), nullable=True)
+        batch_op.alter_column('completed_at', existing_type=sa.DateTime(), nullable=True)
+    op.create_index('ix_quiz_best_results_rank', 'quiz_best_results',
+                    ['quiz_id', sa.text('score DESC'), 'time_spent_seconds', 'completed_at', 'result_id'])
+
+    op.execute("UPDATE quiz_best_results SET time_spent_seconds = NULL WHERE time_spent_seconds = 2147483647")
+    op.execute("UPDATE quiz_best_results SET completed_at = NULL WHERE completed_at = '1900-01-01'")
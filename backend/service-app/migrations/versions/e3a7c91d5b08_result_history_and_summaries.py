@@ -0,0 +1,68 @@
+"""result history and user summaries
+
+Revision ID: e3a7c91d5b08
+Revises: b51e0c8a7f23
+Create Date: 2026-10-19 14:21:37.640912
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3a7c91d5b08'
+down_revision = 'b51e0c8a7f23'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('quiz_results', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('max_score', sa.Integer(), nullable=True))
+    op.create_index('ix_quiz_results_user_history', 'quiz_results',
+                    ['user_id', sa.text('completed_at DESC'), sa.text('id DESC')])
+
+    # Older attempts get the quiz's current total
+    op.execute("""
+        UPDATE quiz_results
+        SET max_score = (SELECT SUM(q.points) FROM questions q WHERE q.quiz_id = quiz_results.quiz_id)
+    """)
+
+    op.create_table('user_result_summaries',
+    sa.Column('user_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('percent_sum', sa.Float(), nullable=False),
+    sa.Column('best_percent', sa.Float(), nullable=True),
+    sa.Column('best_quiz_id', sa.Integer(), nullable=True),
+    sa.Column('best_result_id', sa.Integer(), nullable=True),
+    sa.Column('last_completed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+    op.execute("""
+        INSERT INTO user_result_summaries (user_id, attempts, percent_sum, best_percent, best_quiz_id, best_result_id, last_completed_at)
+        SELECT agg.user_id, agg.attempts, agg.percent_sum, best.pct, best.quiz_id, best.id, agg.last_completed_at
+        FROM (
+            SELECT user_id, COUNT(*) AS attempts,
+                   SUM(CASE WHEN max_score > 0 THEN score * 100.0 / max_score ELSE 0 END) AS percent_sum,
+                   MAX(completed_at) AS last_completed_at
+            FROM quiz_results
+            GROUP BY user_id
+        ) agg
+        JOIN (
+            SELECT user_id, quiz_id, id,
+                   CASE WHEN max_score > 0 THEN score * 100.0 / max_score ELSE 0 END AS pct,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY user_id
+                       ORDER BY CASE WHEN max_score > 0 THEN score * 100.0 / max_score ELSE 0 END DESC, id ASC
+                   ) AS rn
+            FROM quiz_results
+        ) best ON best.user_id = agg.user_id AND best.rn = 1
+    """)
+
+
+def downgrade():
+    op.drop_table('user_result_summaries')
+    op.drop_index('ix_quiz_results_user_history', table_name='quiz_results')
+    with op.batch_alter_table('quiz_results', schema=None) as batch_op:
+        batch_op.drop_column('max_score')
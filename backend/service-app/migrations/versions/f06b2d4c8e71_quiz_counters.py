@@ -0,0 +1,43 @@
+"""quiz counters
+
+Revision ID: f06b2d4c8e71
+Revises: e3a7c91d5b08
+Create Date: 2026-10-19 15:02:18.774530
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f06b2d4c8e71'
+down_revision = 'e3a7c91d5b08'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('quizzes', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('question_count', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('total_points', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('attempt_count', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('score_sum', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('best_score', sa.Integer(), nullable=True))
+
+    op.execute("""
+        UPDATE quizzes SET
+            question_count = (SELECT COUNT(*) FROM questions q WHERE q.quiz_id = quizzes.id),
+            total_points = (SELECT COALESCE(SUM(q.points), 0) FROM questions q WHERE q.quiz_id = quizzes.id),
+            attempt_count = (SELECT COUNT(*) FROM quiz_results r WHERE r.quiz_id = quizzes.id),
+            score_sum = (SELECT COALESCE(SUM(r.score), 0) FROM quiz_results r WHERE r.quiz_id = quizzes.id),
+            best_score = (SELECT MAX(r.score) FROM quiz_results r WHERE r.quiz_id = quizzes.id)
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('quizzes', schema=None) as batch_op:
+        batch_op.drop_column('best_score')
+        batch_op.drop_column('score_sum')
+        batch_op.drop_column('attempt_count')
+        batch_op.drop_column('total_points')
+        batch_op.drop_column('question_count')
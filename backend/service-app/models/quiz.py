@@ -22,6 +22,20 @@ class Quiz(db.Model):
     # config
     duration_seconds = db.Column(db.Integer, nullable=False, default=60)
 
+    # denormalized counters, kept in sync on write (see QuizRepository; repair: `flask repair-quiz-counters`)
+    question_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    total_points = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    attempt_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    score_sum = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    best_score = db.Column(db.Integer, nullable=True)
+
+    # bumped when questions/answers change (they don't touch the quiz row); part of the ETag
+    content_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    # gzipped player JSON (no is_correct), compiled on approval; deferred so lists don't load it
+    player_payload = db.deferred(db.Column(db.LargeBinary, nullable=True))
+    payload_hash = db.Column(db.String(64), nullable=True)
+
     # author snapshot (DB2 nema user tabelu; iako je master, mi ovde NE zavisimo od users)
     author_id = db.Column(db.Integer, nullable=False)
     author_email = db.Column(db.String(255), nullable=True)
@@ -48,6 +62,12 @@ class Quiz(db.Model):
         cascade="all, delete-orphan"
     )
 
+    best_results = db.relationship(
+        'QuizBestResult',
+        lazy=True,
+        cascade="all, delete-orphan"
+    )
+
     def to_dict(self, include_questions=True, include_answers=True, include_correct=True):
         data = {
             "id": self.id,
@@ -56,6 +76,11 @@ class Quiz(db.Model):
             "duration_seconds": self.duration_seconds,
             "author_id": self.author_id,
             "rejection_reason": self.reject_reason,
+            "question_count": self.question_count,
+            "total_points": self.total_points,
+            "attempt_count": self.attempt_count,
+            "average_score": round(self.score_sum / self.attempt_count, 2) if self.attempt_count else None,
+            "best_score": self.best_score,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if getattr(self, "updated_at", None) else None,
         }
@@ -115,6 +140,15 @@ class Answer(db.Model):
 
 class QuizResult(db.Model):
     __tablename__ = 'quiz_results'
+    __table_args__ = (
+        db.Index(
+            'ux_quiz_results_attempt_id', 'attempt_id', unique=True,
+            mssql_where=db.text('attempt_id IS NOT NULL'),
+            sqlite_where=db.text('attempt_id IS NOT NULL')
+        ),
+        # per-user history, newest first
+        db.Index('ix_quiz_results_user_history', 'user_id', db.desc('completed_at'), db.desc('id')),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
@@ -123,9 +157,50 @@ class QuizResult(db.Model):
     user_email = db.Column(db.String(255), nullable=True)
 
     quiz_id = db.Column(db.Integer, db.ForeignKey('quizzes.id'), nullable=False)
+    # client-generated id of the submission; unique so a retried attempt is stored once
+    attempt_id = db.Column(db.String(64), nullable=True)
 
     score = db.Column(db.Integer, nullable=False, default=0)
+    # quiz total at the time of the attempt, for percentages in the history
+    max_score = db.Column(db.Integer, nullable=True)
     time_spent_seconds = db.Column(db.Integer, nullable=True)
 
     completed_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
 
+
+
+class QuizBestResult(db.Model):
+    """Best attempt of each player per quiz; maintained by QuizRepository.save_results_batch."""
+    __tablename__ = 'quiz_best_results'
+    __table_args__ = (
+        db.Index('ix_quiz_best_results_rank', 'quiz_id', db.desc('score'), 'time_spent_seconds', 'completed_at', 'result_id'),
+    )
+
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quizzes.id'), primary_key=True, autoincrement=False)
+    user_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    user_email = db.Column(db.String(255), nullable=True)
+
+    # quiz_results row the best came from
+    result_id = db.Column(db.Integer, nullable=False)
+    score = db.Column(db.Integer, nullable=False)
+    # NOT NULL so the rank index serves ORDER BY/seeks; missing values are stored as
+    # repo.quiz_repo.NO_TIME / NO_COMPLETED_AT
+    time_spent_seconds = db.Column(db.Integer, nullable=False)
+    completed_at = db.Column(db.DateTime, nullable=False)
+
+
+class UserResultSummary(db.Model):
+    """Per-player totals for the history header; maintained by QuizRepository.save_results_batch."""
+    __tablename__ = 'user_result_summaries'
+
+    user_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    # sum of per-attempt percentages; average = percent_sum / attempts
+    percent_sum = db.Column(db.Float, nullable=False, default=0)
+
+    best_percent = db.Column(db.Float, nullable=True)
+    best_quiz_id = db.Column(db.Integer, nullable=True)
+    best_result_id = db.Column(db.Integer, nullable=True)
+
+    last_completed_at = db.Column(db.DateTime, nullable=True)
@@ -0,0 +1,22 @@
+from extensions import db
+from datetime import datetime, timezone
+
+
+class GlobalRanking(db.Model):
+    """
+    Cross-quiz totals per player: sum of their best score on every quiz and the number
+    of quizzes played. Rebuilt from quiz_best_results by RankingService.reconcile.
+    """
+    __tablename__ = 'global_rankings'
+    __table_args__ = (
+        db.Index('ix_global_rankings_total_score', db.desc('total_score')),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False, unique=True)
+    user_email = db.Column(db.String(255), nullable=True)
+
+    total_score = db.Column(db.Integer, nullable=False, default=0)
+    quizzes_completed = db.Column(db.Integer, nullable=False, default=0)
+
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
@@ -1,7 +1,16 @@
+from datetime import datetime
 from extensions import db
-from models.quiz import Quiz, Question, Answer, QuizResult
-from sqlalchemy import asc, desc
-from sqlalchemy.orm import joinedload
+from models.quiz import Quiz, Question, Answer, QuizResult, QuizBestResult, UserResultSummary
+from sqlalchemy import asc, desc, insert, select, update, and_, or_, func, bindparam, case
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
+
+# Stands in for a missing time (sorts last when comparing attempts); stored in quiz_best_results
+NO_TIME = 2147483647
+# Stands in for a missing completed_at in quiz_best_results (sorts first, like NULL)
+NO_COMPLETED_AT = datetime(1900, 1, 1)
+# Attempts at inserting first results before giving up on a PK race
+INSERT_RACE_RETRIES = 3
 
 class QuizRepository:
     
@@ -10,10 +19,6 @@ class QuizRepository:
     def get_quiz_by_id(quiz_id):
         return Quiz.query.get(quiz_id)
 
-    @staticmethod
-    def get_all_quizzes():
-        return Quiz.query.all()
-
     @staticmethod
     def save_quiz(quiz):
         db.session.add(quiz)
@@ -25,6 +30,123 @@ class QuizRepository:
         db.session.delete(quiz)
         db.session.commit()
 
+    # Column order expected by dto/row_serializers.quiz_summaries
+    QUIZ_SUMMARY_COLUMNS = (
+        Quiz.id, Quiz.title, Quiz.status, Quiz.duration_seconds, Quiz.author_id, Quiz.reject_reason,
+        Quiz.question_count, Quiz.total_points, Quiz.attempt_count, Quiz.score_sum, Quiz.best_score,
+        Quiz.created_at, Quiz.updated_at
+    )
+
+    @staticmethod
+    def get_quiz_summary_rows(author_id=None, status=None, quiz_id=None):
+        """Row tuples of QUIZ_SUMMARY_COLUMNS (plus description), in id order; no ORM entities."""
+        query = select(*QuizRepository.QUIZ_SUMMARY_COLUMNS, Quiz.description).order_by(Quiz.id)
+        if author_id is not None:
+            query = query.where(Quiz.author_id == author_id)
+        if status is not None:
+            query = query.where(Quiz.status == status)
+        if quiz_id is not None:
+            query = query.where(Quiz.id == quiz_id)
+        return db.session.execute(query).all()
+
+    @staticmethod
+    def get_question_rows(quiz_id=None, include_correct=True):
+        """
+        (quiz_id, question_id, text, points, answer_id, answer_text[, is_correct]) rows of
+        one quiz or all quizzes, ordered by quiz, question, answer; one query.
+        """
+        columns = [Question.quiz_id, Question.id, Question.text, Question.points, Answer.id, Answer.text]
+        if include_correct:
+            columns.append(Answer.is_correct)
+        query = (
+            select(*columns)
+            .select_from(Question)
+            .outerjoin(Answer, Answer.question_id == Question.id)
+            .order_by(Question.quiz_id, Question.id, Answer.id)
+        )
+        if quiz_id is not None:
+            query = query.where(Question.quiz_id == quiz_id)
+        return db.session.execute(query).all()
+
+    @staticmethod
+    def get_player_payload(quiz_id):
+        """(status, player_payload, payload_hash) without loading the Quiz entity, or None."""
+        return db.session.execute(
+            select(Quiz.status, Quiz.player_payload, Quiz.payload_hash).where(Quiz.id == quiz_id)
+        ).first()
+
+    @staticmethod
+    def bump_content_version(quiz_id=None, question_id=None):
+        """
+        Marks a change to a quiz's questions/answers in the caller's transaction: new
+        content_version (and updated_at) for validators, compiled player payload dropped.
+        """
+        if quiz_id is None:
+            quiz_id = select(Question.quiz_id).where(Question.id == question_id).scalar_subquery()
+        db.session.execute(
+            update(Quiz)
+            .where(Quiz.id == quiz_id)
+            .values(content_version=Quiz.content_version + 1, player_payload=None, payload_hash=None)
+        )
+
+    @staticmethod
+    def get_quiz_validators(quiz_id):
+        """(updated_at, content_version) of a quiz, or None; for conditional GETs."""
+        return db.session.execute(
+            select(Quiz.updated_at, Quiz.content_version).where(Quiz.id == quiz_id)
+        ).first()
+
+    @staticmethod
+    def get_quizzes_fingerprint(author_id=None, status=None):
+        """
+        (count, max id, max updated_at, sum content_version, sum attempt_count) over the
+        matching quizzes: changes with any insert, delete, edit or new attempt.
+        """
+        query = db.session.query(
+            func.count(Quiz.id),
+            func.max(Quiz.id),
+            func.max(Quiz.updated_at),
+            func.sum(Quiz.content_version),
+            func.sum(Quiz.attempt_count)
+        )
+        if author_id is not None:
+            query = query.filter(Quiz.author_id == author_id)
+        if status is not None:
+            query = query.filter(Quiz.status == status)
+        return query.one()
+
+    @staticmethod
+    def bump_question_counters(quiz_id, questions, points):
+        """Adds to question_count/total_points in the caller's transaction."""
+        db.session.execute(
+            update(Quiz)
+            .where(Quiz.id == quiz_id)
+            .values(question_count=Quiz.question_count + questions, total_points=Quiz.total_points + points)
+        )
+
+    @staticmethod
+    def repair_quiz_counters():
+        """Recomputes every quiz's counters from questions and quiz_results. Returns quizzes updated."""
+        questions = db.session.query(func.count(Question.id)).filter(Question.quiz_id == Quiz.id).scalar_subquery()
+        points = db.session.query(func.coalesce(func.sum(Question.points), 0)).filter(Question.quiz_id == Quiz.id).scalar_subquery()
+        attempts = db.session.query(func.count(QuizResult.id)).filter(QuizResult.quiz_id == Quiz.id).scalar_subquery()
+        score_sum = db.session.query(func.coalesce(func.sum(QuizResult.score), 0)).filter(QuizResult.quiz_id == Quiz.id).scalar_subquery()
+        best = db.session.query(func.max(QuizResult.score)).filter(QuizResult.quiz_id == Quiz.id).scalar_subquery()
+
+        result = db.session.execute(
+            update(Quiz)
+            .where(or_(
+                Quiz.question_count != questions, Quiz.total_points != points,
+                Quiz.attempt_count != attempts, Quiz.score_sum != score_sum,
+                func.coalesce(Quiz.best_score, -1) != func.coalesce(best, -1)
+            ))
+            .values(question_count=questions, total_points=points, attempt_count=attempts,
+                    score_sum=score_sum, best_score=best)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        return result.rowcount
+
     # --- QUESTION & ANSWER METHODS ---
     @staticmethod
     def get_question_by_id(question_id):
@@ -44,8 +166,245 @@ class QuizRepository:
         return result
 
     @staticmethod
-    def get_user_results(user_id):
-        return QuizResult.query.filter_by(user_id=user_id).all()
+    def save_results_batch(rows):
+        """
+        Inserts many results (dicts of QuizResult columns) in one transaction and
+        folds them into the per-player aggregates. Returns the per-user changes of the
+        global ranking totals (applied to Redis by the caller after the commit).
+        """
+        ids = db.session.execute(
+            insert(QuizResult).returning(QuizResult.id, sort_by_parameter_order=True), rows
+        ).scalars().all()
+        stored = [dict(row, result_id=result_id) for row, result_id in zip(rows, ids)]
+
+        ranking_deltas = QuizRepository._update_best_results(stored)
+        QuizRepository._update_user_summaries(stored)
+        QuizRepository._update_quiz_counters(stored)
+        db.session.commit()
+        return ranking_deltas
+
+    @staticmethod
+    def _beats(new, old):
+        """Higher score wins, then less time; on a full tie the earlier attempt stays."""
+        if new["score"] != old["score"]:
+            return new["score"] > old["score"]
+        return (new["time_spent_seconds"] if new["time_spent_seconds"] is not None else NO_TIME) < \
+            (old["time_spent_seconds"] if old["time_spent_seconds"] is not None else NO_TIME)
+
+    @staticmethod
+    def _update_best_results(rows):
+        # Best of this batch per (quiz, user); rows are in submission order
+        best = {}
+        for row in rows:
+            key = (row["quiz_id"], row["user_id"])
+            if key not in best or QuizRepository._beats(row, best[key]):
+                best[key] = row
+
+        user_ids_by_quiz = {}
+        for quiz_id, user_id in best:
+            user_ids_by_quiz.setdefault(quiz_id, []).append(user_id)
+
+        def values(row):
+            return {
+                "quiz_id": row["quiz_id"],
+                "user_id": row["user_id"],
+                "user_email": row.get("user_email"),
+                "result_id": row["result_id"],
+                "score": row["score"],
+                "time_spent_seconds": row["time_spent_seconds"] if row["time_spent_seconds"] is not None else NO_TIME,
+                "completed_at": row.get("completed_at") or NO_COMPLETED_AT,
+            }
+
+        for attempt in range(INSERT_RACE_RETRIES):
+            existing = {}
+            for quiz_id, user_ids in user_ids_by_quiz.items():
+                for user_id, score, time_spent in (
+                    db.session.query(QuizBestResult.user_id, QuizBestResult.score, QuizBestResult.time_spent_seconds)
+                    .filter(QuizBestResult.quiz_id == quiz_id, QuizBestResult.user_id.in_(user_ids))
+                ):
+                    existing[(quiz_id, user_id)] = {"score": score, "time_spent_seconds": time_spent}
+
+            new_rows = [values(row) for key, row in best.items() if key not in existing]
+            if not new_rows:
+                break
+            try:
+                with db.session.begin_nested():
+                    db.session.execute(insert(QuizBestResult), new_rows)
+                break
+            except IntegrityError:
+                # A concurrent first result of the same player won the insert; re-read, then update
+                if attempt == INSERT_RACE_RETRIES - 1:
+                    raise
+
+        # Effect on each player's cross-quiz totals (sum of best scores, quizzes played)
+        ranking_deltas = {}
+
+        def add_delta(row, old):
+            delta = ranking_deltas.setdefault(row["user_id"], {"score": 0, "completed": 0, "user_email": row.get("user_email")})
+            delta["score"] += row["score"] - (old["score"] if old else 0)
+            delta["completed"] += 0 if old else 1
+
+        for key, row in best.items():
+            if key not in existing:
+                add_delta(row, None)  # inserted above
+
+        # Compare-and-swap on the (score, time) that was read: when it matches, the delta is
+        # exact; otherwise a concurrent writer changed the row, so re-read and decide again
+        table = QuizBestResult.__table__
+        for (quiz_id, user_id), row in best.items():
+            old = existing.get((quiz_id, user_id))
+            for _ in range(INSERT_RACE_RETRIES):
+                if old is None or not QuizRepository._beats(row, old):
+                    break
+                result = db.session.execute(
+                    update(table)
+                    .where(
+                        table.c.quiz_id == quiz_id,
+                        table.c.user_id == user_id,
+                        table.c.score == old["score"],
+                        table.c.time_spent_seconds == old["time_spent_seconds"]
+                    )
+                    .values({k: v for k, v in values(row).items() if k not in ("quiz_id", "user_id")})
+                )
+                if result.rowcount == 1:
+                    add_delta(row, old)
+                    break
+                current = (
+                    db.session.query(QuizBestResult.score, QuizBestResult.time_spent_seconds)
+                    .filter(QuizBestResult.quiz_id == quiz_id, QuizBestResult.user_id == user_id)
+                    .first()
+                )
+                old = {"score": current.score, "time_spent_seconds": current.time_spent_seconds} if current else None
+
+        return ranking_deltas
+
+    @staticmethod
+    def _update_quiz_counters(rows):
+        per_quiz = {}
+        for row in rows:
+            agg = per_quiz.setdefault(row["quiz_id"], {"b_attempts": 0, "b_score_sum": 0, "b_best": row["score"]})
+            agg["b_attempts"] += 1
+            agg["b_score_sum"] += row["score"]
+            agg["b_best"] = max(agg["b_best"], row["score"])
+
+        table = Quiz.__table__
+        db.session.execute(
+            update(table)
+            .where(table.c.id == bindparam("b_quiz_id"))
+            .values(
+                attempt_count=table.c.attempt_count + bindparam("b_attempts"),
+                score_sum=table.c.score_sum + bindparam("b_score_sum"),
+                best_score=case(
+                    (func.coalesce(table.c.best_score, -1) < bindparam("b_best"), bindparam("b_best")),
+                    else_=table.c.best_score
+                ),
+                # attempts are not content changes
+                updated_at=table.c.updated_at,
+            ),
+            [dict(agg, b_quiz_id=quiz_id) for quiz_id, agg in per_quiz.items()]
+        )
+
+    @staticmethod
+    def _percent(row):
+        return row["score"] * 100.0 / row["max_score"] if row.get("max_score") else 0.0
+
+    @staticmethod
+    def _update_user_summaries(rows):
+        per_user = {}
+        for row in rows:
+            percent = QuizRepository._percent(row)
+            agg = per_user.setdefault(row["user_id"], {
+                "attempts": 0, "percent_sum": 0.0, "best_percent": -1.0,
+                "best_quiz_id": None, "best_result_id": None, "last_completed_at": None,
+            })
+            agg["attempts"] += 1
+            agg["percent_sum"] += percent
+            if percent > agg["best_percent"]:
+                agg.update(best_percent=percent, best_quiz_id=row["quiz_id"], best_result_id=row["result_id"])
+            completed_at = row.get("completed_at")
+            if completed_at is not None and (agg["last_completed_at"] is None or completed_at > agg["last_completed_at"]):
+                agg["last_completed_at"] = completed_at
+
+        for attempt in range(INSERT_RACE_RETRIES):
+            existing = {
+                user_id for (user_id,) in
+                db.session.query(UserResultSummary.user_id).filter(UserResultSummary.user_id.in_(list(per_user)))
+            }
+            new_rows = [dict(agg, user_id=user_id) for user_id, agg in per_user.items() if user_id not in existing]
+            if not new_rows:
+                break
+            try:
+                with db.session.begin_nested():
+                    db.session.execute(insert(UserResultSummary), new_rows)
+                break
+            except IntegrityError:
+                # A concurrent writer created the summary first; re-read, then increment it
+                if attempt == INSERT_RACE_RETRIES - 1:
+                    raise
+
+        updates = [{f"b_{k}": v for k, v in dict(agg, user_id=user_id).items()}
+                   for user_id, agg in per_user.items() if user_id in existing]
+        if updates:
+            # Increments in SQL, so concurrent writers don't lose each other's attempts
+            table = UserResultSummary.__table__
+            improves = func.coalesce(table.c.best_percent, -1.0) < bindparam("b_best_percent")
+            # Late flushes of older attempts must not move it backwards
+            newer = or_(table.c.last_completed_at.is_(None), table.c.last_completed_at < bindparam("b_last_completed_at"))
+            stmt = (
+                update(table)
+                .where(table.c.user_id == bindparam("b_user_id"))
+                .values(
+                    attempts=table.c.attempts + bindparam("b_attempts"),
+                    percent_sum=table.c.percent_sum + bindparam("b_percent_sum"),
+                    best_percent=case((improves, bindparam("b_best_percent")), else_=table.c.best_percent),
+                    best_quiz_id=case((improves, bindparam("b_best_quiz_id")), else_=table.c.best_quiz_id),
+                    best_result_id=case((improves, bindparam("b_best_result_id")), else_=table.c.best_result_id),
+                    last_completed_at=case((newer, bindparam("b_last_completed_at")), else_=table.c.last_completed_at),
+                )
+            )
+            db.session.execute(stmt, updates)
+
+    @staticmethod
+    def get_user_summary(user_id):
+        """(UserResultSummary, best quiz title) or None."""
+        return (
+            db.session.query(UserResultSummary, Quiz.title)
+            .outerjoin(Quiz, Quiz.id == UserResultSummary.best_quiz_id)
+            .filter(UserResultSummary.user_id == user_id)
+            .first()
+        )
+
+    @staticmethod
+    def get_user_results_page(user_id, limit, before=None):
+        """
+        One page of a user's attempts, newest first, with quiz titles. `before` is the
+        (completed_at, id) of the last row of the previous page; completed_at is None
+        once paging has reached the rows without one, which sort last under DESC.
+        """
+        query = (
+            db.session.query(
+                QuizResult.id, QuizResult.quiz_id, Quiz.title, QuizResult.score,
+                QuizResult.max_score, QuizResult.time_spent_seconds, QuizResult.completed_at
+            )
+            .join(Quiz, Quiz.id == QuizResult.quiz_id)
+            .filter(QuizResult.user_id == user_id)
+        )
+        if before is not None:
+            completed_at, result_id = before
+            if completed_at is None:
+                query = query.filter(QuizResult.completed_at.is_(None), QuizResult.id < result_id)
+            else:
+                query = query.filter(or_(
+                    QuizResult.completed_at < completed_at,
+                    and_(QuizResult.completed_at == completed_at, QuizResult.id < result_id),
+                    QuizResult.completed_at.is_(None)
+                ))
+        return query.order_by(desc(QuizResult.completed_at), desc(QuizResult.id)).limit(limit).all()
+
+    @staticmethod
+    def get_result_by_attempt_id(attempt_id):
+        return QuizResult.query.filter_by(attempt_id=attempt_id).first()
+
 
     
 
@@ -86,28 +445,61 @@ class QuizRepository:
     def has_correct_answer(question_id):
         return Answer.query.filter_by(question_id=question_id, is_correct=True).count() > 0
     
+    # Leaderboard order with a unique last key, so pages and windows are stable on ties;
+    # the raw columns, so it is read straight off ix_quiz_best_results_rank
     @staticmethod
-    def get_leaderboard_for_quiz(quiz_id: int, limit: int = 10):
+    def _leaderboard_order(entity=QuizBestResult):
         return (
-            QuizResult.query
-            .filter_by(quiz_id=quiz_id)
-            .order_by(
-                desc(QuizResult.score),
-                asc(QuizResult.time_spent_seconds),
-                asc(QuizResult.completed_at)
-            )
-            .limit(limit)
-            .all()
+            desc(entity.score),
+            asc(entity.time_spent_seconds),
+            asc(entity.completed_at),
+            asc(entity.result_id)
         )
-    
+
     @staticmethod
-    def get_all_quizzes_full():
-        return (
-            Quiz.query
-            .options(
-                joinedload(Quiz.questions).joinedload(Question.answers)
-            )
-            .all()
+    def get_leaderboard_for_quiz(quiz_id: int, limit: int = 10, after=None):
+        """
+        Top players by their best attempt (one entry per player). `after` is the
+        (score, time_spent_seconds, completed_at, result_id) of the previous page's last
+        row; the next page is then a keyset seek instead of an OFFSET scan.
+        """
+        query = QuizBestResult.query.filter_by(quiz_id=quiz_id)
+        if after is not None:
+            score, time_spent, completed_at, result_id = after
+            time_key = QuizBestResult.time_spent_seconds
+            completed_key = QuizBestResult.completed_at
+            query = query.filter(or_(
+                QuizBestResult.score < score,
+                and_(QuizBestResult.score == score, time_key > time_spent),
+                and_(QuizBestResult.score == score, time_key == time_spent, completed_key > completed_at),
+                and_(QuizBestResult.score == score, time_key == time_spent, completed_key == completed_at,
+                     QuizBestResult.result_id > result_id)
+            ))
+        return query.order_by(*QuizRepository._leaderboard_order()).limit(limit).all()
+
+    @staticmethod
+    def get_leaderboard_window(quiz_id: int, size: int, user_id=None, rank=None):
+        """
+        (target_rank, [(QuizBestResult, rank)]) for up to `size` players on each side of a
+        player or of a rank; (None, []) if the player has no result on this quiz.
+        """
+        position = func.row_number().over(order_by=QuizRepository._leaderboard_order()).label("position")
+        ranked = (
+            db.session.query(QuizBestResult, position)
+            .filter(QuizBestResult.quiz_id == quiz_id)
+            .subquery()
         )
+        entry = aliased(QuizBestResult, ranked)
 
+        if user_id is not None:
+            rank = db.session.query(ranked.c.position).filter(ranked.c.user_id == user_id).scalar()
+            if rank is None:
+                return None, []
 
+        rows = (
+            db.session.query(entry, ranked.c.position)
+            .filter(ranked.c.position.between(rank - size, rank + size))
+            .order_by(ranked.c.position)
+            .all()
+        )
+        return rank, rows
@@ -1,5 +1,8 @@
 from flask import Blueprint, request, jsonify
+from flask_jwt_extended import get_jwt_identity, jwt_required
 from services.quiz_service import QuizService
+from repo.quiz_repo import QuizRepository
+from dto.request_dto import BulkQuestions, decode_request
 
 question_bp = Blueprint("question_bp", __name__)
 
@@ -12,6 +15,30 @@ def add_question(quiz_id):
     return jsonify({"question_id": question.id}), 201
 
 
+@question_bp.route("/quizzes/<int:quiz_id>/questions/bulk", methods=["POST"])
+@jwt_required()
+def add_questions_bulk(quiz_id):
+    """Adds all questions with their answers in one request and one transaction."""
+    quiz = QuizRepository.get_quiz_by_id(quiz_id)
+    if not quiz:
+        return jsonify({"error": "Quiz not found"}), 404
+    if str(quiz.author_id) != str(get_jwt_identity()):
+        return jsonify({"error": "You can only edit your own quizzes"}), 403
+
+    try:
+        bulk = decode_request(BulkQuestions, request.get_data())
+        questions = QuizService.add_questions_bulk(quiz_id, bulk.questions)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({
+        "questions": [
+            {"question_id": q.id, "answer_ids": [a.id for a in q.answers]}
+            for q in questions
+        ]
+    }), 201
+
+
 @question_bp.route("/questions/<int:question_id>/answers", methods=["POST"])
 def add_answer(question_id):
     data = request.get_json()
@@ -1,13 +1,20 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import get_jwt_identity, jwt_required, get_jwt
+import gzip
+from datetime import datetime
+from flask import Blueprint, Response, request, jsonify
+from flask_jwt_extended import get_jwt_identity, jwt_required, get_jwt, verify_jwt_in_request
 from services.quiz_service import QuizService
-from services.mail_service import send_results_email, send_pdf_email
+from services.mail_service import send_pdf_email
+from services.attempt_service import AttemptService, AttemptInProgressError, AttemptExpiredError
+from services.quiz_stats_service import QuizStatsService
 from services.pdf_service import build_quiz_report_pdf
-from models.quiz import Question, Answer, QuizResult, Quiz
-from repo.quiz_repo import QuizRepository
+from models.quiz import Quiz, QuizStatus
+from repo.quiz_repo import QuizRepository, NO_TIME, NO_COMPLETED_AT
 from utils.decorators import admin_required
-import time
+from utils.conditional import make_etag, not_modified, with_validators
+from dto.row_serializers import quiz_summaries, questions_by_quiz
+from dto.request_dto import QuizSubmission, AnswersAutosave, decode_request
 from extensions import db, socketio
+import redis
 
 quiz_bp = Blueprint("quiz_bp", __name__)
 
@@ -80,152 +87,247 @@ def reject_quiz(quiz_id: int):
 def list_quizzes():
     include = request.args.get("include", "summary")
 
+    count, max_id, last_modified, versions, attempts = QuizRepository.get_quizzes_fingerprint()
+    etag = make_etag("quizzes", include, count, max_id, last_modified, versions, attempts)
+    # No Last-Modified: attempt counters change without touching updated_at
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
+    quizzes = quiz_summaries(QuizRepository.get_quiz_summary_rows())
     if include == "full":
-        quizzes = QuizRepository.get_all_quizzes_full()
-        return jsonify([
-            q.to_dict(
-                include_questions=True,
-                include_answers=True,
-                include_correct=True
-            ) for q in quizzes
-        ]), 200
-
-    quizzes = QuizRepository.get_all_quizzes()
-    return jsonify([
-        q.to_dict(include_questions=False) for q in quizzes
-    ]), 200
+        questions = questions_by_quiz(QuizRepository.get_question_rows())
+        for quiz in quizzes:
+            quiz["questions"] = questions.get(quiz["id"], [])
+
+    return with_validators(jsonify(quizzes), etag), 200
 
 @quiz_bp.route("/quizzes/<int:quiz_id>/full", methods=["GET"])
 @jwt_required()
 def get_full_quiz(quiz_id: int):
-    quiz = QuizRepository.get_quiz_by_id(quiz_id)
-    if not quiz:
+    validators = QuizRepository.get_quiz_validators(quiz_id)
+    if not validators:
         return jsonify({"error": "Quiz not found"}), 404
 
-    # Manual payload building to ensure structure for frontend
-    questions = Question.query.filter_by(quiz_id=quiz_id).all()
+    etag = make_etag("quiz", quiz_id, validators.updated_at, validators.content_version)
+    cached = not_modified(etag, validators.updated_at)
+    if cached:
+        return cached
+
+    rows = QuizRepository.get_quiz_summary_rows(quiz_id=quiz_id)
+    if not rows:
+        return jsonify({"error": "Quiz not found"}), 404
+
+    quiz = rows[0]
     payload = {
         "id": quiz.id,
         "title": quiz.title,
         "description": quiz.description,
         "status": quiz.status,
         "duration_seconds": quiz.duration_seconds,
-        "questions": []
+        "questions": questions_by_quiz(QuizRepository.get_question_rows(quiz_id)).get(quiz_id, [])
     }
 
-    for q in questions:
-        answers = Answer.query.filter_by(question_id=q.id).all()
-        payload["questions"].append({
-            "id": q.id,
-            "text": q.text,
-            "points": q.points,
-            "answers": [
-                {"id": a.id, "text": a.text, "is_correct": a.is_correct}
-                for a in answers
-            ]
-        })
-
-    return jsonify(payload), 200
+    return with_validators(jsonify(payload), etag, validators.updated_at), 200
 
 # --- PLAYING / SCORING ROUTES ---
 
+@quiz_bp.route("/quizzes/<int:quiz_id>/play", methods=["GET"])
+@jwt_required()
+def get_play_quiz(quiz_id: int):
+    """Player view of an approved quiz: the payload compiled on approval, served as stored (gzip)."""
+    row = QuizRepository.get_player_payload(quiz_id)
+    if row is None or row.status != QuizStatus.APPROVED:
+        return jsonify({"error": "Quiz not found"}), 404
+
+    payload, payload_hash = row.player_payload, row.payload_hash
+    if payload is None:
+        # Approved before payloads existed, or edited since
+        quiz = QuizService.compile_player_payload(QuizRepository.get_quiz_by_id(quiz_id))
+        db.session.commit()
+        payload, payload_hash = quiz.player_payload, quiz.payload_hash
+
+    if request.if_none_match.contains_weak(payload_hash):
+        response = Response(status=304)
+    elif request.accept_encodings["gzip"]:
+        response = Response(payload, mimetype="application/json")
+        response.headers["Content-Encoding"] = "gzip"
+    else:
+        response = Response(gzip.decompress(payload), mimetype="application/json")
+    # One validator for the gzip and the identity body, so only a weak one (as in utils/compression)
+    response.set_etag(payload_hash, weak=True)
+    response.headers["Vary"] = "Accept-Encoding"
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+@quiz_bp.route("/quizzes/<int:quiz_id>/start", methods=["POST"])
+@jwt_required()
+def start_attempt(quiz_id: int):
+    """Opens a timed attempt; its attempt_id is sent back with /process."""
+    try:
+        session = AttemptService.start_attempt(quiz_id, int(get_jwt_identity()))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(session), 201
+
 @quiz_bp.route("/quizzes/<int:quiz_id>/process", methods=["POST"])
 @jwt_required()
 def process_quiz(quiz_id: int):
     """
     Student submits their answers.
-    Calculates score and saves to QuizResult.
+    Calculates score and saves to QuizResult. Resubmitting the same attempt_id
+    returns the stored result instead of scoring it again.
     """
-    payload = request.get_json(silent=True) or {}
+    try:
+        submission = decode_request(QuizSubmission, request.get_data())
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     current_user_id = get_jwt_identity()
     claims = get_jwt()
     user_email = claims.get("email", "Unknown")
 
-    time_spent_seconds = payload.get("time_spent_seconds")
-    answers = payload.get("answers")
-
-    if time_spent_seconds is None or not isinstance(answers, list):
-        return jsonify({"error": "Invalid payload"}), 400
-
-    quiz = Quiz.query.get(quiz_id)
-    if not quiz or quiz.status != "APPROVED":
-        return jsonify({"error": "Quiz not found or not available"}), 400
-
-    # Simulate processing delay
-    time.sleep(3)
-
-    # Scoring Logic
-    submitted = {int(item.get("question_id")): set(int(x) for x in item.get("answer_ids", [])) 
-                 for item in answers if item.get("question_id") is not None}
-
-    questions = Question.query.filter_by(quiz_id=quiz_id).all()
-    score = 0
-    correct_count = 0
-    max_score = sum((q.points or 0) for q in questions)
-
-    for q in questions:
-        correct_answers = Answer.query.filter_by(question_id=q.id, is_correct=True).all()
-        correct_set = set(a.id for a in correct_answers)
-        submitted_set = submitted.get(q.id, set())
-
-        if len(correct_set) > 0 and submitted_set == correct_set:
-            score += int(q.points or 0)
-            correct_count += 1
-
-    # Database Persistance
-    result = QuizResult(
-        user_id=int(current_user_id),
-        user_email=user_email,
-        quiz_id=quiz_id,
-        score=int(score),
-        time_spent_seconds=int(time_spent_seconds)
-    )
-
-    send_results_email(
-        to_email=user_email,
-        quiz_id=quiz_id,
-        score=result.score,
-        max_score=max_score,
-        time_spent_seconds=time_spent_seconds
-    )
-    
     try:
-        db.session.add(result)
-        db.session.commit()
+        # time_spent_seconds is ignored for attempts opened with /start, the server measures those itself
+        result = AttemptService.process_attempt(
+            quiz_id=quiz_id,
+            user_id=int(current_user_id),
+            user_email=user_email,
+            time_spent_seconds=submission.time_spent_seconds,
+            answers=submission.answers,
+            attempt_id=submission.attempt_id
+        )
+    except AttemptInProgressError as e:
+        return jsonify({"error": str(e)}), 409
+    except AttemptExpiredError as e:
+        return jsonify({"error": str(e)}), 403
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception:
         db.session.rollback()
         return jsonify({"error": "Database error while saving result"}), 500
 
-    return jsonify({
-        "quiz_id": quiz_id,
-        "score": int(score),
-        "max_score": int(max_score),
-        "correct_count": correct_count,
-        "total_questions": len(questions),
-        "time_spent_seconds": time_spent_seconds
-    }), 200
+    return jsonify(result), 200
+
+@quiz_bp.route("/attempts/<attempt_id>/answers", methods=["PUT"])
+@jwt_required()
+def autosave_answers(attempt_id: str):
+    """Autosave of in-progress answers; kept in Redis until /process."""
+    try:
+        autosave = decode_request(AnswersAutosave, request.get_data())
+        saved = AttemptService.save_answers(attempt_id, int(get_jwt_identity()), autosave.answers)
+    except AttemptExpiredError as e:
+        return jsonify({"error": str(e)}), 403
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except redis.RedisError:
+        return jsonify({"error": "Autosave unavailable"}), 503
+    return jsonify({"attempt_id": attempt_id, "saved_questions": saved}), 200
+
+@quiz_bp.route("/attempts/<attempt_id>/answers", methods=["GET"])
+@jwt_required()
+def resume_attempt(attempt_id: str):
+    try:
+        return jsonify(AttemptService.resume_attempt(attempt_id, int(get_jwt_identity()))), 200
+    except AttemptExpiredError as e:
+        return jsonify({"error": str(e)}), 404
+    except redis.RedisError:
+        return jsonify({"error": "Autosave unavailable"}), 503
+
+def _leaderboard_entry(r, rank):
+    return {
+        "rank": rank,
+        "result_id": r.result_id,
+        "user_id": r.user_id,
+        "user_email": r.user_email,
+        "score": r.score,
+        "time_spent_seconds": r.time_spent_seconds if r.time_spent_seconds != NO_TIME else None,
+        "completed_at": r.completed_at.isoformat() if r.completed_at != NO_COMPLETED_AT else None
+    }
+
+
+def _encode_leaderboard_cursor(r, rank):
+    return f"{r.score}_{r.time_spent_seconds}_{r.completed_at.isoformat()}_{r.result_id}_{rank}"
+
+
+def _decode_leaderboard_cursor(cursor):
+    score, time_key, completed_at, result_id, rank = cursor.split("_")
+    return (int(score), int(time_key), datetime.fromisoformat(completed_at), int(result_id)), int(rank)
+
 
 @quiz_bp.route("/quizzes/<int:quiz_id>/leaderboard", methods=["GET"])
 def quiz_leaderboard(quiz_id: int):
+    """
+    Best result per player, ranked. Pages with `after` (next_cursor of the previous
+    page); `around_user=<id|me>` or `around_rank=<n>` returns `window` players on each
+    side of that player/rank instead.
+    """
+    around_user = request.args.get("around_user")
+    around_rank = request.args.get("around_rank", type=int)
+    if around_user is not None or around_rank is not None:
+        window = request.args.get("window", default=5, type=int)
+        window = max(1, min(window, 50))
+
+        user_id = None
+        if around_user == "me":
+            verify_jwt_in_request()
+            user_id = int(get_jwt_identity())
+        elif around_user is not None:
+            if not around_user.isdigit():
+                return jsonify({"error": "Invalid around_user"}), 400
+            user_id = int(around_user)
+
+        rank, rows = QuizRepository.get_leaderboard_window(
+            quiz_id, window, user_id=user_id, rank=None if user_id is not None else max(1, around_rank)
+        )
+        if rank is None:
+            return jsonify({"error": "User has no result on this quiz"}), 404
+        return jsonify({
+            "quiz_id": quiz_id,
+            "target_rank": rank,
+            "results": [_leaderboard_entry(r, position) for r, position in rows]
+        }), 200
+
     limit = request.args.get("limit", default=10, type=int)
     limit = max(1, min(limit, 100))
 
-    results = QuizRepository.get_leaderboard_for_quiz(quiz_id, limit=limit)
-    payload = [{
-        "result_id": r.id,
-        "user_id": r.user_id,
-        "user_email": r.user_email,
-        "score": r.score,
-        "time_spent_seconds": r.time_spent_seconds,
-        "completed_at": r.completed_at.isoformat() if r.completed_at else None
-    } for r in results]
+    after, last_rank = None, 0
+    cursor = request.args.get("after")
+    if cursor:
+        try:
+            after, last_rank = _decode_leaderboard_cursor(cursor)
+        except ValueError:
+            return jsonify({"error": "Invalid cursor"}), 400
+
+    results = QuizRepository.get_leaderboard_for_quiz(quiz_id, limit=limit + 1, after=after)
+    has_more = len(results) > limit
+    results = results[:limit]
+    payload = [_leaderboard_entry(r, last_rank + i) for i, r in enumerate(results, start=1)]
 
     return jsonify({
         "quiz_id": quiz_id,
-        "results": payload
+        "results": payload,
+        "next_cursor": _encode_leaderboard_cursor(results[-1], last_rank + len(results)) if has_more else None
     }), 200
 
 
+@quiz_bp.route("/quizzes/<int:quiz_id>/stats", methods=["GET"])
+@jwt_required()
+def quiz_stats(quiz_id: int):
+    """Score histogram, percentiles (percent of max score) and distinct players; author or admin."""
+    quiz = Quiz.query.get(quiz_id)
+    if not quiz:
+        return jsonify({"error": "Quiz not found"}), 404
+    if str(quiz.author_id) != str(get_jwt_identity()) and get_jwt().get("role") != "ADMIN":
+        return jsonify({"error": "Only the author can view quiz stats"}), 403
+
+    try:
+        return jsonify(QuizStatsService.get_stats(quiz_id)), 200
+    except redis.RedisError:
+        return jsonify({"error": "Stats unavailable"}), 503
+
+
 @quiz_bp.route("/quizzes/<int:quiz_id>/send-report", methods=["POST"])
 @jwt_required()
 def send_quiz_report(quiz_id: int):
@@ -242,14 +344,7 @@ def send_quiz_report(quiz_id: int):
 
         leaderboard_data = {
             "quiz_id": quiz_id,
-            "results": [
-                {
-                    "user_email": r.user_email,
-                    "score": r.score,
-                    "time_spent_seconds": r.time_spent_seconds,
-                    "completed_at": r.completed_at.isoformat() if r.completed_at else None
-                } for r in results
-            ]
+            "results": [_leaderboard_entry(r, rank) for rank, r in enumerate(results, start=1)]
         }
     except Exception as e:
         return jsonify({"error": f"Failed to fetch leaderboard: {str(e)}"}), 500
@@ -301,12 +396,19 @@ def get_my_rejected_quizzes():
     current_user_id = get_jwt_identity()
     
     try:
-        rejected_quizzes = QuizService.get_rejected_quizzes_by_author(current_user_id)
-        
-        # We use include_questions=False for the list view to keep the payload light
-        return jsonify([
-            q.to_dict(include_questions=False) for q in rejected_quizzes
-        ]), 200
+        count, max_id, last_modified, versions, attempts = QuizRepository.get_quizzes_fingerprint(
+            author_id=int(current_user_id), status=QuizStatus.REJECTED
+        )
+        etag = make_etag("rejected", current_user_id, count, max_id, last_modified, versions, attempts)
+        # ETag only: quizzes leave this set on resubmit/delete, so MAX(updated_at) can go backwards
+        cached = not_modified(etag)
+        if cached:
+            return cached
+
+        rows = QuizRepository.get_quiz_summary_rows(author_id=int(current_user_id), status=QuizStatus.REJECTED)
+
+        # Summary rows only (no questions) to keep the list view light
+        return with_validators(jsonify(quiz_summaries(rows)), etag), 200
     except Exception as e:
         return jsonify({"error": f"Failed to fetch rejected quizzes: {str(e)}"}), 500
 
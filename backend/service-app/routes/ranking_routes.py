@@ -0,0 +1,23 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import get_jwt_identity, jwt_required
+from services.ranking_service import RankingService
+from config import Config
+
+ranking_bp = Blueprint("ranking_bp", __name__)
+
+
+@ranking_bp.route("/rankings", methods=["GET"])
+def global_ranking():
+    """Top players across all quizzes (sum of best scores)."""
+    limit = request.args.get("limit", default=10, type=int)
+    limit = max(1, min(limit, Config.RANKING_MAX_LIMIT))
+    return jsonify({"results": RankingService.top(limit)}), 200
+
+
+@ranking_bp.route("/rankings/me", methods=["GET"])
+@jwt_required()
+def my_ranking():
+    entry = RankingService.rank_of(int(get_jwt_identity()))
+    if entry is None:
+        return jsonify({"error": "No results yet"}), 404
+    return jsonify(entry), 200
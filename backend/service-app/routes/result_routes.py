@@ -0,0 +1,73 @@
+from datetime import datetime
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import get_jwt_identity, jwt_required
+from repo.quiz_repo import QuizRepository
+from config import Config
+
+result_bp = Blueprint("result_bp", __name__)
+
+
+def _encode_cursor(row):
+    # Rows without completed_at sort last; their cursor is id-only ("_<id>")
+    completed_at = row.completed_at.isoformat() if row.completed_at else ""
+    return f"{completed_at}_{row.id}"
+
+
+def _decode_cursor(cursor):
+    completed_at, result_id = cursor.rsplit("_", 1)
+    return (datetime.fromisoformat(completed_at) if completed_at else None), int(result_id)
+
+
+@result_bp.route("/results/me", methods=["GET"])
+@jwt_required()
+def my_results():
+    """Attempt history of the current user, newest first (keyset pagination via `cursor`)."""
+    limit = request.args.get("limit", default=20, type=int)
+    limit = max(1, min(limit, Config.RESULT_HISTORY_MAX_LIMIT))
+
+    before = None
+    cursor = request.args.get("cursor")
+    if cursor:
+        try:
+            before = _decode_cursor(cursor)
+        except ValueError:
+            return jsonify({"error": "Invalid cursor"}), 400
+
+    rows = QuizRepository.get_user_results_page(int(get_jwt_identity()), limit + 1, before)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    return jsonify({
+        "items": [{
+            "result_id": r.id,
+            "quiz_id": r.quiz_id,
+            "quiz_title": r.title,
+            "score": r.score,
+            "max_score": r.max_score,
+            "time_spent_seconds": r.time_spent_seconds,
+            "completed_at": r.completed_at.isoformat() if r.completed_at else None
+        } for r in rows],
+        "next_cursor": _encode_cursor(rows[-1]) if has_more else None
+    }), 200
+
+
+@result_bp.route("/results/me/summary", methods=["GET"])
+@jwt_required()
+def my_results_summary():
+    """Stats header for the history page, read from the precomputed summary row."""
+    found = QuizRepository.get_user_summary(int(get_jwt_identity()))
+    if found is None:
+        return jsonify({"attempts": 0, "average_percent": None, "best": None}), 200
+
+    summary, best_title = found
+    return jsonify({
+        "attempts": summary.attempts,
+        "average_percent": round(summary.percent_sum / summary.attempts, 1) if summary.attempts else None,
+        "best": {
+            "quiz_id": summary.best_quiz_id,
+            "quiz_title": best_title,
+            "result_id": summary.best_result_id,
+            "percent": round(summary.best_percent, 1)
+        } if summary.best_quiz_id is not None else None,
+        "last_completed_at": summary.last_completed_at.isoformat() if summary.last_completed_at else None
+    }), 200
@@ -1,11 +1,16 @@
 from app import create_app
 from extensions import socketio
+from services.ranking_service import RankingService
+from services.result_writer import ResultWriter
 import os
 
 app = create_app()
 
 if __name__ == '__main__':
     port = int(os.getenv("PORT", 5001))
+    RankingService.start_reconciler(app)
+    # Drains rows queued before a restart and recovers rows of dead writers
+    ResultWriter.start(app)
     
     socketio.run(
         app, 
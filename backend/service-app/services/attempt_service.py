@@ -0,0 +1,355 @@
+import hashlib
+import json
+import time
+import uuid
+from datetime import datetime, timezone
+import redis
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from extensions import db, cache
+from config import Config
+from models.quiz import Quiz, Question, Answer
+from repo.quiz_repo import QuizRepository
+from services.mail_service import send_results_email
+from services.result_writer import ResultWriter
+
+ATTEMPT_KEY_PREFIX = "attempt:"
+SESSION_KEY_PREFIX = "attempt_session:"
+ANSWERS_KEY_PREFIX = "attempt_answers:"
+MAX_ATTEMPT_ID_LENGTH = 64
+
+
+class AttemptInProgressError(Exception):
+    pass
+
+
+class AttemptExpiredError(ValueError):
+    pass
+
+
+class AttemptService:
+    """
+    Scores quiz submissions exactly once per attempt_id.
+
+    Redis holds `attempt:<attempt_id>` -> {"state": "processing"} while the first
+    submission is scored, then {"state": "done", "user_id", "result"}; retries get the
+    stored result without re-scoring, re-inserting or re-mailing. The unique
+    quiz_results.attempt_id index is the backstop when Redis is unavailable or the
+    entry has expired.
+
+    Results are inserted through ResultWriter, so a new row can reach the database a
+    few milliseconds after the response.
+
+    `start_attempt` opens a timed session `attempt_session:<attempt_id>` (Redis hash with
+    user, quiz, start, deadline and a fingerprint of the served questions, expiring
+    shortly after the deadline); /process then measures the time itself and rejects
+    submissions that arrive after the deadline plus ATTEMPT_GRACE_SECONDS.
+
+    Autosaved answers live in `attempt_answers:<attempt_id>` (question_id -> answer id
+    list, overwritten in place, same lifetime as the session). They are only read on
+    resume and merged into the final submission, never written to the database.
+    """
+
+    @staticmethod
+    def _key(attempt_id):
+        return f"{ATTEMPT_KEY_PREFIX}{attempt_id}"
+
+    @staticmethod
+    def claim(attempt_id):
+        """Returns None if this call owns the attempt, otherwise the stored entry."""
+        try:
+            marker = json.dumps({"state": "processing"})
+            if cache.set(AttemptService._key(attempt_id), marker, nx=True, ex=Config.ATTEMPT_PROCESSING_TTL_SECONDS):
+                return None
+            raw = cache.get(AttemptService._key(attempt_id))
+        except redis.RedisError as e:
+            print("ATTEMPT: redis unavailable, relying on DB constraint:", e)
+            return None
+        # Expired between SET and GET -> treat as ours
+        return json.loads(raw) if raw else None
+
+    @staticmethod
+    def complete(attempt_id, user_id, result):
+        entry = json.dumps({"state": "done", "user_id": user_id, "result": result})
+        try:
+            cache.setex(AttemptService._key(attempt_id), Config.ATTEMPT_RESULT_TTL_SECONDS, entry)
+        except redis.RedisError as e:
+            print("ATTEMPT: redis unavailable, result not cached:", e)
+
+    @staticmethod
+    def release(attempt_id):
+        """Drops the processing marker after a failure so the client can retry."""
+        try:
+            cache.delete(AttemptService._key(attempt_id))
+        except redis.RedisError:
+            pass
+
+    @staticmethod
+    def _session_key(attempt_id):
+        return f"{SESSION_KEY_PREFIX}{attempt_id}"
+
+    @staticmethod
+    def question_fingerprint(question_ids):
+        return hashlib.sha256(",".join(str(i) for i in sorted(question_ids)).encode()).hexdigest()[:16]
+
+    @staticmethod
+    def start_attempt(quiz_id, user_id):
+        """Opens a timed attempt; the served questions are the quiz's current ones."""
+        quiz = Quiz.query.get(quiz_id)
+        if not quiz or quiz.status != "APPROVED":
+            raise ValueError("Quiz not found or not available")
+
+        question_ids = [row.id for row in db.session.query(Question.id).filter(Question.quiz_id == quiz_id)]
+        attempt_id = uuid.uuid4().hex
+        started_at = time.time()
+        deadline = started_at + quiz.duration_seconds
+
+        key = AttemptService._session_key(attempt_id)
+        try:
+            pipe = cache.pipeline()
+            pipe.hset(key, mapping={
+                "user_id": user_id,
+                "quiz_id": quiz_id,
+                "started_at": started_at,
+                "deadline": deadline,
+                "fingerprint": AttemptService.question_fingerprint(question_ids),
+            })
+            pipe.expire(key, quiz.duration_seconds + Config.ATTEMPT_GRACE_SECONDS + Config.ATTEMPT_SESSION_EXTRA_TTL_SECONDS)
+            pipe.execute()
+        except redis.RedisError as e:
+            # /process falls back to the client-reported time while Redis is down
+            print("ATTEMPT: redis unavailable, attempt not timed:", e)
+
+        return {
+            "attempt_id": attempt_id,
+            "quiz_id": quiz_id,
+            "started_at": started_at,
+            "deadline": deadline,
+            "duration_seconds": quiz.duration_seconds,
+            "server_time": started_at,
+        }
+
+    @staticmethod
+    def _answers_key(attempt_id):
+        return f"{ANSWERS_KEY_PREFIX}{attempt_id}"
+
+    @staticmethod
+    def _owned_session(attempt_id, user_id):
+        session = cache.hgetall(AttemptService._session_key(attempt_id))
+        if not session or int(session["user_id"]) != user_id:
+            raise AttemptExpiredError("Attempt not started or already expired")
+        return session
+
+    @staticmethod
+    def _selections(answers):
+        """[AnswerSelection] -> {question_id: sorted answer ids}; a repeated question keeps its last entry."""
+        return {item.question_id: sorted(set(item.answer_ids)) for item in answers}
+
+    @staticmethod
+    def save_answers(attempt_id, user_id, answers):
+        """Overwrites the autosaved selection of the given questions while the attempt is open."""
+        session = AttemptService._owned_session(attempt_id, user_id)
+        if time.time() > float(session["deadline"]) + Config.ATTEMPT_GRACE_SECONDS:
+            raise AttemptExpiredError("Time is up")
+
+        parsed = AttemptService._selections(answers)
+        if not parsed:
+            return 0
+        key = AttemptService._answers_key(attempt_id)
+        pipe = cache.pipeline()
+        pipe.hset(key, mapping={str(qid): json.dumps(ids) for qid, ids in parsed.items()})
+        pipe.expireat(key, int(float(session["deadline"])) + Config.ATTEMPT_GRACE_SECONDS + Config.ATTEMPT_SESSION_EXTRA_TTL_SECONDS)
+        pipe.execute()
+        return len(parsed)
+
+    @staticmethod
+    def _load_saved_answers(attempt_id):
+        saved = cache.hgetall(AttemptService._answers_key(attempt_id))
+        return {int(qid): json.loads(ids) for qid, ids in saved.items()}
+
+    @staticmethod
+    def resume_attempt(attempt_id, user_id):
+        """Session timing plus autosaved answers, for continuing after a reload."""
+        session = AttemptService._owned_session(attempt_id, user_id)
+        saved = AttemptService._load_saved_answers(attempt_id)
+        return {
+            "attempt_id": attempt_id,
+            "quiz_id": int(session["quiz_id"]),
+            "started_at": float(session["started_at"]),
+            "deadline": float(session["deadline"]),
+            "server_time": time.time(),
+            "answers": [{"question_id": qid, "answer_ids": ids} for qid, ids in saved.items()],
+        }
+
+    @staticmethod
+    def _merge_saved_answers(attempt_id, submitted):
+        """Autosaved answers with the submitted ones on top (submission wins per question)."""
+        try:
+            merged = AttemptService._load_saved_answers(attempt_id)
+        except redis.RedisError as e:
+            print("ATTEMPT: redis unavailable, autosaved answers skipped:", e)
+            return submitted
+        merged.update(submitted)
+        return merged
+
+    @staticmethod
+    def _discard_saved_answers(attempt_id):
+        try:
+            cache.delete(AttemptService._answers_key(attempt_id))
+        except redis.RedisError:
+            pass
+
+    @staticmethod
+    def _timed_seconds(attempt_id, quiz_id, user_id, client_seconds):
+        """Server-measured time spent for a started attempt (client value only without a session)."""
+        try:
+            session = cache.hgetall(AttemptService._session_key(attempt_id)) if attempt_id else {}
+        except redis.RedisError as e:
+            print("ATTEMPT: redis unavailable, using client time:", e)
+            session = None
+
+        if not session:
+            if session is not None and Config.ATTEMPT_REQUIRE_SESSION:
+                raise AttemptExpiredError("Attempt not started or already expired")
+            if client_seconds is None:
+                raise ValueError("Invalid payload")
+            return int(client_seconds)
+
+        if int(session["user_id"]) != user_id or int(session["quiz_id"]) != quiz_id:
+            raise ValueError("Attempt does not belong to this quiz")
+
+        now = time.time()
+        if now > float(session["deadline"]) + Config.ATTEMPT_GRACE_SECONDS:
+            raise AttemptExpiredError("Time is up, submission rejected")
+
+        question_ids = [row.id for row in db.session.query(Question.id).filter(Question.quiz_id == quiz_id)]
+        if AttemptService.question_fingerprint(question_ids) != session["fingerprint"]:
+            raise ValueError("Quiz was changed during the attempt")
+
+        duration = float(session["deadline"]) - float(session["started_at"])
+        return int(min(now - float(session["started_at"]), duration))
+
+    @staticmethod
+    def _stored_result(entry, user_id):
+        if entry.get("state") != "done":
+            raise AttemptInProgressError("Attempt is already being processed")
+        if entry.get("user_id") != user_id:
+            raise ValueError("Attempt id already used")
+        return entry["result"]
+
+    @staticmethod
+    def score(quiz, submitted):
+        """(score, max_score, correct_count, total_questions) for {question_id: answer ids}."""
+
+        # Totals come from the quiz counters; only the correct answers are loaded (one query)
+        correct_by_question = {}
+        points_by_question = {}
+        for question_id, points, answer_id in (
+            db.session.query(Question.id, Question.points, Answer.id)
+            .join(Answer, Answer.question_id == Question.id)
+            .filter(Question.quiz_id == quiz.id, Answer.is_correct.is_(True))
+        ):
+            correct_by_question.setdefault(question_id, set()).add(answer_id)
+            points_by_question[question_id] = points or 0
+
+        score = 0
+        correct_count = 0
+        for question_id, correct_set in correct_by_question.items():
+            if set(submitted.get(question_id, ())) == correct_set:
+                score += int(points_by_question[question_id])
+                correct_count += 1
+
+        return score, quiz.total_points, correct_count, quiz.question_count
+
+    @staticmethod
+    def _result_from_row(row):
+        quiz = QuizRepository.get_quiz_by_id(row.quiz_id)
+        return {
+            "quiz_id": row.quiz_id,
+            "score": int(row.score),
+            "max_score": int(row.max_score if row.max_score is not None else quiz.total_points),
+            "correct_count": None,
+            "total_questions": quiz.question_count,
+            "time_spent_seconds": row.time_spent_seconds,
+        }
+
+    @staticmethod
+    def process_attempt(quiz_id, user_id, user_email, time_spent_seconds, answers, attempt_id=None):
+        """
+        Scores and stores a submission ([AnswerSelection]) and mails the result. Raises ValueError for
+        invalid input (AttemptExpiredError for late or unknown attempts),
+        AttemptInProgressError while the same attempt is being scored.
+        """
+        if attempt_id is not None:
+            attempt_id = str(attempt_id)
+            if not attempt_id or len(attempt_id) > MAX_ATTEMPT_ID_LENGTH:
+                raise ValueError("Invalid attempt_id")
+
+            entry = AttemptService.claim(attempt_id)
+            if entry is not None:
+                return AttemptService._stored_result(entry, user_id)
+
+        try:
+            quiz = Quiz.query.get(quiz_id)
+            if not quiz or quiz.status != "APPROVED":
+                raise ValueError("Quiz not found or not available")
+
+            time_spent_seconds = AttemptService._timed_seconds(attempt_id, quiz_id, user_id, time_spent_seconds)
+            submitted = AttemptService._selections(answers)
+            if attempt_id is not None:
+                submitted = AttemptService._merge_saved_answers(attempt_id, submitted)
+
+            score, max_score, correct_count, total_questions = AttemptService.score(quiz, submitted)
+
+            row = {
+                "user_id": user_id,
+                "user_email": user_email,
+                "quiz_id": quiz_id,
+                "attempt_id": attempt_id,
+                "score": int(score),
+                "max_score": int(max_score),
+                "time_spent_seconds": int(time_spent_seconds),
+                "completed_at": datetime.now(timezone.utc),
+            }
+            # Bursts go through the write-behind queue; direct insert if it is off or down
+            queued = Config.RESULT_WRITE_BEHIND and ResultWriter.submit(current_app._get_current_object(), row)
+            if not queued:
+                try:
+                    ResultWriter.store([row])
+                except IntegrityError:
+                    # Same attempt_id was stored earlier (Redis entry lost/expired)
+                    db.session.rollback()
+                    existing = QuizRepository.get_result_by_attempt_id(attempt_id)
+                    if attempt_id is None or existing is None:
+                        raise
+                    if existing.user_id != user_id:
+                        raise ValueError("Attempt id already used")
+                    payload = AttemptService._result_from_row(existing)
+                    AttemptService.complete(attempt_id, user_id, payload)
+                    return payload
+        except Exception:
+            if attempt_id is not None:
+                AttemptService.release(attempt_id)
+            raise
+
+        payload = {
+            "quiz_id": quiz_id,
+            "score": int(score),
+            "max_score": int(max_score),
+            "correct_count": correct_count,
+            "total_questions": total_questions,
+            "time_spent_seconds": time_spent_seconds
+        }
+        if attempt_id is not None:
+            AttemptService.complete(attempt_id, user_id, payload)
+            AttemptService._discard_saved_answers(attempt_id)
+
+        # Only after the result is committed or durably queued, and only once per attempt
+        send_results_email(
+            to_email=user_email,
+            quiz_id=quiz_id,
+            score=payload["score"],
+            max_score=payload["max_score"],
+            time_spent_seconds=time_spent_seconds
+        )
+        return payload
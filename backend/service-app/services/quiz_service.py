@@ -1,6 +1,10 @@
+import gzip
+import hashlib
+import json
 from models.quiz import Quiz, QuizStatus, Question, Answer
 from extensions import db
 from repo.quiz_repo import QuizRepository
+from dto.row_serializers import questions_by_quiz
 
 
 class QuizService:
@@ -27,8 +31,29 @@ class QuizService:
             points=data.get("points", 1)
         )
         db.session.add(question)
+        QuizRepository.bump_question_counters(quiz_id, 1, int(question.points or 0))
+        QuizRepository.bump_content_version(quiz_id)
         db.session.commit()
         return question
+
+    @staticmethod
+    def add_questions_bulk(quiz_id, items):
+        """Adds questions with their answers ([BulkQuestion], already validated) in one transaction."""
+        questions = [
+            Question(
+                quiz_id=quiz_id,
+                text=item.text,
+                points=item.points,
+                answers=[Answer(text=a.text, is_correct=a.is_correct) for a in item.answers]
+            )
+            for item in items
+        ]
+
+        db.session.add_all(questions)
+        QuizRepository.bump_question_counters(quiz_id, len(questions), sum(q.points for q in questions))
+        QuizRepository.bump_content_version(quiz_id)
+        db.session.commit()
+        return questions
     
     @staticmethod
     def add_answer(question_id, data):
@@ -38,6 +63,7 @@ class QuizService:
             is_correct=data.get("is_correct", False)
         )
         db.session.add(answer)
+        QuizRepository.bump_content_version(question_id=question_id)
         db.session.commit()
         return answer
 
@@ -88,9 +114,34 @@ class QuizService:
 
         quiz.status = QuizStatus.APPROVED
         quiz.reject_reason = None
+        QuizService.compile_player_payload(quiz)
         db.session.commit()
         return quiz
 
+    @staticmethod
+    def compile_player_payload(quiz):
+        """
+        Builds what a player needs to take the quiz (no is_correct), gzips it and stores
+        it with its hash on the quiz; the caller commits. Play fetches serve these bytes as is.
+        """
+        rows = QuizRepository.get_question_rows(quiz.id, include_correct=False)
+        questions = questions_by_quiz(rows, include_correct=False).get(quiz.id, [])
+
+        body = json.dumps({
+            "id": quiz.id,
+            "title": quiz.title,
+            "description": quiz.description,
+            "duration_seconds": quiz.duration_seconds,
+            "question_count": len(questions),
+            "total_points": sum(q["points"] or 0 for q in questions),
+            "questions": questions
+        }, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+        # mtime=0 keeps the blob identical for identical content
+        quiz.player_payload = gzip.compress(body, compresslevel=9, mtime=0)
+        quiz.payload_hash = hashlib.sha256(body).hexdigest()
+        return quiz
+
     @staticmethod
     def reject_quiz(quiz_id: int, reason: str):
         quiz = QuizRepository.get_quiz_by_id(quiz_id)
@@ -136,13 +187,7 @@ class QuizService:
         if "duration_seconds" in data:
             quiz.duration_seconds = int(data["duration_seconds"])
 
+        if quiz.status == QuizStatus.APPROVED:
+            QuizService.compile_player_payload(quiz)
         db.session.commit()
         return quiz
-
-    @staticmethod
-    def get_rejected_quizzes_by_author(author_id: int):
-        """Fetches all quizzes for a specific author that have been REJECTED."""
-        return Quiz.query.filter_by(
-            author_id=author_id, 
-            status=QuizStatus.REJECTED
-        ).all()
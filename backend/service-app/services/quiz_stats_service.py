@@ -0,0 +1,187 @@
+import redis
+from extensions import db, cache
+from config import Config
+from models.quiz import Quiz, QuizResult
+from utils.tdigest import TDigest
+
+KEY_PREFIX = "quiz_stats:"
+PERCENTILES = (10, 25, 50, 75, 90, 99)
+CHUNK = 1000
+
+
+def _keys(quiz_id):
+    base = f"{KEY_PREFIX}{quiz_id}"
+    return {
+        "hist": f"{base}:hist",
+        "digest": f"{base}:digest",
+        "buffer": f"{base}:digest_buffer",
+        "players": f"{base}:players",
+    }
+
+
+class QuizStatsService:
+    """
+    Per-quiz score distribution kept in Redis, so stats cost the same at 10 or 10M attempts.
+
+    Scores are stored as percent of the attempt's max_score:
+      - hist: hash of fixed-width buckets (QUIZ_STATS_BUCKETS over 0-100%)
+      - digest: t-digest for percentiles; new values go to a short list first and are
+        folded in once QUIZ_STATS_DIGEST_BUFFER of them piled up
+      - players: HyperLogLog of distinct user ids
+    The hash doubles as the "built" marker: a quiz without it (never read, or Redis lost
+    its data) is rebuilt from quiz_results once, instead of counting from zero.
+    """
+
+    @staticmethod
+    def _percent(score, max_score):
+        return score * 100.0 / max_score if max_score else 0.0
+
+    @staticmethod
+    def _bucket(percent):
+        buckets = Config.QUIZ_STATS_BUCKETS
+        return min(max(int(percent * buckets // 100), 0), buckets - 1)
+
+    # --- writes ---
+    @staticmethod
+    def record(rows):
+        """Adds committed result rows (dicts with quiz_id, user_id, score, max_score)."""
+        by_quiz = {}
+        for row in rows:
+            by_quiz.setdefault(row["quiz_id"], []).append(row)
+
+        try:
+            pipe = cache.pipeline(transaction=False)
+            for quiz_id in by_quiz:
+                pipe.exists(_keys(quiz_id)["hist"])
+            built = pipe.execute()
+
+            pipe = cache.pipeline(transaction=False)
+            to_fold = []
+            for (quiz_id, quiz_rows), exists in zip(by_quiz.items(), built):
+                if not exists:
+                    # The rebuild reads the rows just committed as well
+                    QuizStatsService.rebuild(quiz_id)
+                    continue
+                keys = _keys(quiz_id)
+                percents = [QuizStatsService._percent(r["score"], r.get("max_score")) for r in quiz_rows]
+                for percent in percents:
+                    pipe.hincrby(keys["hist"], QuizStatsService._bucket(percent), 1)
+                pipe.rpush(keys["buffer"], *percents)
+                pipe.pfadd(keys["players"], *{r["user_id"] for r in quiz_rows})
+                to_fold.append(quiz_id)
+            results = pipe.execute()
+        except redis.RedisError as e:
+            print("QUIZ STATS: redis unavailable, stats fixed on next rebuild:", e)
+            return
+
+        # Results come in per quiz as [hincrby..., rpush -> buffer length, pfadd]
+        position = 0
+        for quiz_id in to_fold:
+            position += len(by_quiz[quiz_id]) + 2
+            if results[position - 2] >= Config.QUIZ_STATS_DIGEST_BUFFER:
+                QuizStatsService._fold(quiz_id)
+
+    @staticmethod
+    def _fold(quiz_id):
+        """Merges the buffered values into the stored digest."""
+        keys = _keys(quiz_id)
+        with cache.pipeline() as pipe:
+            try:
+                pipe.watch(keys["digest"])
+                digest = TDigest.from_text(pipe.get(keys["digest"]))
+                values = pipe.lrange(keys["buffer"], 0, -1)
+                digest.update(values)
+                pipe.multi()
+                pipe.set(keys["digest"], digest.to_text())
+                # Values pushed meanwhile stay in the buffer
+                pipe.ltrim(keys["buffer"], len(values), -1)
+                pipe.execute()
+            except redis.WatchError:
+                # Another writer folded first; the rest is picked up next time
+                pass
+            except redis.RedisError as e:
+                print("QUIZ STATS: digest not folded:", e)
+
+    @staticmethod
+    def rebuild(quiz_id):
+        """Recomputes all sketches of a quiz from quiz_results and swaps them in."""
+        quiz = Quiz.query.get(quiz_id)
+        if quiz is None:
+            return 0
+
+        keys = _keys(quiz_id)
+        tmp = {name: f"{key}:rebuild" for name, key in keys.items()}
+        cache.delete(*tmp.values())
+
+        buckets = [0] * Config.QUIZ_STATS_BUCKETS
+        digest = TDigest()
+        count = 0
+        chunk, players = [], set()
+
+        def flush():
+            digest.update(chunk)
+            if players:
+                cache.pfadd(tmp["players"], *players)
+            chunk.clear()
+            players.clear()
+
+        rows = (
+            db.session.query(QuizResult.score, QuizResult.max_score, QuizResult.user_id)
+            .filter(QuizResult.quiz_id == quiz_id)
+            .yield_per(CHUNK)
+        )
+        for score, max_score, user_id in rows:
+            percent = QuizStatsService._percent(score, max_score if max_score is not None else quiz.total_points)
+            buckets[QuizStatsService._bucket(percent)] += 1
+            chunk.append(percent)
+            players.add(user_id)
+            count += 1
+            if len(chunk) >= CHUNK:
+                flush()
+        flush()
+
+        pipe = cache.pipeline(transaction=True)
+        pipe.hset(tmp["hist"], mapping={i: n for i, n in enumerate(buckets)})
+        pipe.rename(tmp["hist"], keys["hist"])
+        pipe.set(keys["digest"], digest.to_text())
+        pipe.delete(keys["buffer"])
+        if count:
+            pipe.rename(tmp["players"], keys["players"])
+        else:
+            pipe.delete(keys["players"])
+        pipe.execute()
+        return count
+
+    # --- reads ---
+    @staticmethod
+    def get_stats(quiz_id):
+        """Histogram, percentiles and distinct players of a quiz; raises redis.RedisError."""
+        keys = _keys(quiz_id)
+        if not cache.exists(keys["hist"]):
+            QuizStatsService.rebuild(quiz_id)
+
+        pipe = cache.pipeline(transaction=False)
+        pipe.hgetall(keys["hist"])
+        pipe.get(keys["digest"])
+        pipe.lrange(keys["buffer"], 0, -1)
+        pipe.pfcount(keys["players"])
+        hist, stored_digest, buffered, players = pipe.execute()
+
+        digest = TDigest.from_text(stored_digest).update(buffered)
+        buckets = Config.QUIZ_STATS_BUCKETS
+        width = 100 / buckets
+        counts = [int(hist.get(str(i), 0)) for i in range(buckets)]
+
+        return {
+            "quiz_id": quiz_id,
+            "attempts": sum(counts),
+            "distinct_players": players,
+            "histogram": [
+                {"from_percent": round(i * width, 2), "to_percent": round((i + 1) * width, 2), "count": n}
+                for i, n in enumerate(counts)
+            ],
+            "percentiles": {
+                f"p{p}": round(digest.quantile(p / 100), 2) if digest.count else None
+                for p in PERCENTILES
+            },
+        }
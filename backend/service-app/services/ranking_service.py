@@ -0,0 +1,260 @@
+import json
+import redis
+from sqlalchemy import func, desc, asc, insert
+from extensions import db, cache, socketio
+from config import Config
+from models.quiz import QuizBestResult
+from models.ranking import GlobalRanking
+from dto.response_dto import RankingResponseDTO
+
+RANKING_KEY = "global_ranking"
+COMPLETED_KEY = "global_ranking:completed"
+EMAILS_KEY = "global_ranking:emails"
+RECONCILE_LOCK_KEY = "global_ranking:reconcile_lock"
+REBUILD_LOCK_KEY = "global_ranking:rebuild_lock"
+# While a rebuild runs, deltas are also journaled and replayed onto the new set before the swap
+REBUILDING_KEY = "global_ranking:rebuilding"
+JOURNAL_KEY = "global_ranking:journal"
+REBUILD_JOURNAL_TTL_SECONDS = 600
+RECONCILE_CHECK_SECONDS = 30
+REBUILD_SUFFIX = ":rebuild"
+CHUNK = 1000
+
+
+class _Entry:
+    def __init__(self, user_id, user_email, total_score, quizzes_completed):
+        self.user_id = user_id
+        self.user_email = user_email
+        self.total_score = total_score
+        self.quizzes_completed = quizzes_completed
+
+
+class RankingService:
+    """
+    Global ranking across quizzes: a player's total is the sum of their best score on
+    every quiz they played.
+
+    New best results move the totals incrementally (ZINCRBY on the `global_ranking`
+    sorted set), so top-N and "my rank" are O(log n) reads. `reconcile` recomputes
+    everything from quiz_best_results into the global_rankings table and swaps a
+    freshly built sorted set in; it runs periodically and repairs deltas lost to a
+    crash or a Redis restart. Deltas applied while it runs are journaled and replayed
+    onto the new set before the swap, so none are lost in between. The SQL table also
+    serves reads while Redis is down.
+    """
+
+    # --- writes ---
+    @staticmethod
+    def apply_deltas(deltas):
+        """Applies {user_id: {"score", "completed", "user_email"}} from QuizRepository.save_results_batch."""
+        if not deltas:
+            return
+        try:
+            pipe = cache.pipeline(transaction=False)
+            pipe.exists(RANKING_KEY)
+            pipe.exists(REBUILDING_KEY)
+            ranking_exists, rebuilding = pipe.execute()
+
+            pipe = cache.pipeline(transaction=False)
+            # Deltas on a missing set would start it from zero; reads use SQL until the rebuild
+            if ranking_exists:
+                RankingService._queue_deltas(pipe, deltas.items())
+            if rebuilding:
+                pipe.rpush(JOURNAL_KEY, *(
+                    json.dumps(dict(delta, user_id=user_id)) for user_id, delta in deltas.items()
+                ))
+                pipe.expire(JOURNAL_KEY, REBUILD_JOURNAL_TTL_SECONDS)
+            pipe.execute()
+        except redis.RedisError as e:
+            print("RANKING: redis unavailable, totals fixed on next reconcile:", e)
+
+    @staticmethod
+    def _queue_deltas(pipe, items, keys=None):
+        """Queues ZINCRBY/HINCRBY/HSET for (user_id, delta) pairs on pipe."""
+        ranking, completed, emails = keys or (RANKING_KEY, COMPLETED_KEY, EMAILS_KEY)
+        for user_id, delta in items:
+            pipe.zincrby(ranking, delta["score"], user_id)
+            if delta["completed"]:
+                pipe.hincrby(completed, user_id, delta["completed"])
+            if delta.get("user_email"):
+                pipe.hset(emails, user_id, delta["user_email"])
+
+    @staticmethod
+    def reconcile():
+        """Rebuilds global_rankings and the Redis sorted set from quiz_best_results."""
+        # Set before the totals query, so every delta committed after the query is journaled.
+        # A delta committed just before the query but applied just after this is counted
+        # twice; that window is one commit-to-apply gap and the next reconcile repairs it.
+        try:
+            pipe = cache.pipeline(transaction=True)
+            pipe.delete(JOURNAL_KEY)
+            pipe.set(REBUILDING_KEY, 1, ex=REBUILD_JOURNAL_TTL_SECONDS)
+            pipe.execute()
+        except redis.RedisError as e:
+            print("RANKING: redis unavailable, deltas during the rebuild not journaled:", e)
+
+        totals = (
+            db.session.query(
+                QuizBestResult.user_id,
+                func.max(QuizBestResult.user_email),
+                func.sum(QuizBestResult.score),
+                func.count(QuizBestResult.quiz_id)
+            )
+            .group_by(QuizBestResult.user_id)
+            .all()
+        )
+
+        GlobalRanking.query.delete()
+        if totals:
+            db.session.execute(insert(GlobalRanking), [
+                {"user_id": user_id, "user_email": email, "total_score": int(total or 0), "quizzes_completed": count}
+                for user_id, email, total, count in totals
+            ])
+        db.session.commit()
+
+        try:
+            RankingService._rebuild_redis(totals)
+        except redis.RedisError as e:
+            print("RANKING: redis unavailable, sorted set not rebuilt:", e)
+        return len(totals)
+
+    @staticmethod
+    def _rebuild_redis(totals):
+        keys = (RANKING_KEY, COMPLETED_KEY, EMAILS_KEY)
+        tmp = {key: f"{key}{REBUILD_SUFFIX}" for key in keys}
+        cache.delete(*tmp.values())
+        for i in range(0, len(totals), CHUNK):
+            chunk = totals[i:i + CHUNK]
+            pipe = cache.pipeline(transaction=False)
+            pipe.zadd(tmp[RANKING_KEY], {user_id: int(total or 0) for user_id, _, total, _ in chunk})
+            pipe.hset(tmp[COMPLETED_KEY], mapping={user_id: count for user_id, _, _, count in chunk})
+            emails = {user_id: email for user_id, email, _, _ in chunk if email}
+            if emails:
+                pipe.hset(tmp[EMAILS_KEY], mapping=emails)
+            pipe.execute()
+
+        # Replay the journal onto the new keys, then swap all three at once; WATCH makes
+        # the swap fail (and the replay continue) if a delta was journaled meanwhile
+        tmp_keys = tuple(tmp[key] for key in keys)
+        replayed = 0
+        with cache.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    pipe.watch(JOURNAL_KEY)
+                    entries = pipe.lrange(JOURNAL_KEY, replayed, -1)
+                    if entries:
+                        replay = cache.pipeline(transaction=False)
+                        # Entries may repeat a user, so replay them one by one
+                        RankingService._queue_deltas(replay, (
+                            (entry.pop("user_id"), entry) for entry in map(json.loads, entries)
+                        ), tmp_keys)
+                        replay.execute()
+                        replayed += len(entries)
+                        pipe.unwatch()
+                        continue
+                    existing = [pipe.exists(tmp[key]) for key in keys]
+                    pipe.multi()
+                    for key, exists in zip(keys, existing):
+                        if exists:
+                            pipe.rename(tmp[key], key)
+                        else:
+                            pipe.delete(key)
+                    pipe.delete(REBUILDING_KEY, JOURNAL_KEY)
+                    pipe.execute()
+                    return
+                except redis.WatchError:
+                    continue
+
+    # --- reads ---
+    @staticmethod
+    def top(limit):
+        try:
+            if cache.exists(RANKING_KEY):
+                return RankingService._top_from_redis(limit)
+        except redis.RedisError as e:
+            print("RANKING: redis unavailable, reading global_rankings:", e)
+
+        rows = (
+            GlobalRanking.query
+            .order_by(desc(GlobalRanking.total_score), asc(GlobalRanking.user_id))
+            .limit(limit)
+            .all()
+        )
+        return RankingService._with_ranks(rows)
+
+    @staticmethod
+    def _top_from_redis(limit):
+        members = cache.zrevrange(RANKING_KEY, 0, limit - 1, withscores=True)
+        if not members:
+            return []
+        user_ids = [member for member, _ in members]
+        pipe = cache.pipeline(transaction=False)
+        pipe.hmget(COMPLETED_KEY, user_ids)
+        pipe.hmget(EMAILS_KEY, user_ids)
+        completed, emails = pipe.execute()
+        return RankingService._with_ranks([
+            _Entry(int(member), email, int(score), int(count or 0))
+            for (member, score), count, email in zip(members, completed, emails)
+        ])
+
+    @staticmethod
+    def _with_ranks(entries):
+        # Competition ranking: equal totals share a rank (1, 2, 2, 4)
+        ranked = []
+        rank = 0
+        previous = None
+        for position, entry in enumerate(entries, start=1):
+            if entry.total_score != previous:
+                rank, previous = position, entry.total_score
+            ranked.append(RankingResponseDTO(entry, rank=rank).to_dict())
+        return ranked
+
+    @staticmethod
+    def rank_of(user_id):
+        """Rank entry of one player, or None if they have no results yet."""
+        try:
+            if cache.exists(RANKING_KEY):
+                score = cache.zscore(RANKING_KEY, user_id)
+                if score is None:
+                    return None
+                pipe = cache.pipeline(transaction=False)
+                pipe.zcount(RANKING_KEY, f"({score}", "+inf")
+                pipe.hget(COMPLETED_KEY, user_id)
+                pipe.hget(EMAILS_KEY, user_id)
+                higher, completed, email = pipe.execute()
+                entry = _Entry(user_id, email, int(score), int(completed or 0))
+                return RankingResponseDTO(entry, rank=higher + 1).to_dict()
+        except redis.RedisError as e:
+            print("RANKING: redis unavailable, reading global_rankings:", e)
+
+        row = GlobalRanking.query.filter_by(user_id=user_id).first()
+        if row is None:
+            return None
+        higher = GlobalRanking.query.filter(GlobalRanking.total_score > row.total_score).count()
+        return RankingResponseDTO(row, rank=higher + 1).to_dict()
+
+    # --- periodic reconcile ---
+    @staticmethod
+    def _acquire_reconcile():
+        # One process per interval does the work; a missing sorted set (Redis restart) is rebuilt sooner
+        if not cache.exists(RANKING_KEY):
+            return cache.set(REBUILD_LOCK_KEY, 1, nx=True, ex=RECONCILE_CHECK_SECONDS)
+        return cache.set(RECONCILE_LOCK_KEY, 1, nx=True, ex=max(1, Config.RANKING_RECONCILE_SECONDS - 1))
+
+    @staticmethod
+    def start_reconciler(app):
+        def run():
+            with app.app_context():
+                while True:
+                    try:
+                        if RankingService._acquire_reconcile():
+                            count = RankingService.reconcile()
+                            print(f"RANKING: reconciled {count} player(s)")
+                    except Exception as e:
+                        db.session.rollback()
+                        print("RANKING RECONCILE ERROR:", e)
+                    finally:
+                        db.session.remove()
+                    socketio.sleep(RECONCILE_CHECK_SECONDS)
+
+        socketio.start_background_task(run)
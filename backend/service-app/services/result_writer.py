@@ -0,0 +1,213 @@
+import json
+import os
+import socket
+import threading
+import time
+from datetime import datetime
+import redis
+from sqlalchemy.exc import IntegrityError, OperationalError
+from extensions import db, cache, socketio
+from config import Config
+from repo.quiz_repo import QuizRepository
+from services.ranking_service import RankingService
+from services.quiz_stats_service import QuizStatsService
+
+PENDING_KEY = "result_writer:pending"
+PROCESSING_KEY_PREFIX = "result_writer:processing:"
+ALIVE_KEY_PREFIX = "result_writer:alive:"
+DEAD_LETTER_KEY = "result_writer:dead"
+ALIVE_TTL_SECONDS = 30
+RECOVER_EVERY_SECONDS = 15
+MAX_BACKOFF_SECONDS = 30
+
+# Moves up to ARGV[1] rows from the queue to the processing list in one step
+CLAIM_SCRIPT = cache.register_script("""
+local items = redis.call('LRANGE', KEYS[1], 0, tonumber(ARGV[1]) - 1)
+if #items > 0 then
+    redis.call('RPUSH', KEYS[2], unpack(items))
+    redis.call('LTRIM', KEYS[1], #items, -1)
+end
+return items
+""")
+
+_worker_id = f"{socket.gethostname()}:{os.getpid()}"
+_started = False
+_start_lock = threading.Lock()
+_failed_flushes = 0
+
+
+class ResultWriter:
+    """
+    Write-behind buffer for QuizResult rows.
+
+    `submit` appends the row to a Redis list and returns; a background task per
+    process moves up to RESULT_BATCH_SIZE rows into its own processing list every
+    RESULT_FLUSH_INTERVAL_MS, inserts them with one batched INSERT and then drops the
+    processing list. A crash between the two leaves the rows in the processing list,
+    and the next writer that notices the dead owner puts them back into the queue,
+    so accepted attempts are not lost (they may be retried; attempt_id stays unique).
+
+    A batch that keeps failing is retried RESULT_MAX_RETRIES times with backoff, then
+    stored row by row; rows that still fail go to the dead-letter list
+    (`flask requeue-dead-results` puts them back once the cause is fixed).
+    """
+
+    @staticmethod
+    def _processing_key(worker_id=_worker_id):
+        return f"{PROCESSING_KEY_PREFIX}{worker_id}"
+
+    @staticmethod
+    def submit(app, row):
+        """Queues a result row (dict of QuizResult columns). False if Redis is unavailable."""
+        try:
+            cache.rpush(PENDING_KEY, json.dumps(row, default=lambda v: v.isoformat()))
+        except redis.RedisError as e:
+            print("RESULT WRITER: redis unavailable, falling back to direct insert:", e)
+            return False
+        ResultWriter.start(app)
+        return True
+
+    @staticmethod
+    def start(app):
+        global _started
+        if _started:
+            return
+        with _start_lock:
+            if _started:
+                return
+            _started = True
+        # socketio picks a green thread under eventlet, a real thread otherwise
+        socketio.start_background_task(ResultWriter._run, app)
+
+    @staticmethod
+    def _decode(raw):
+        row = json.loads(raw)
+        if row.get("completed_at"):
+            row["completed_at"] = datetime.fromisoformat(row["completed_at"])
+        return row
+
+    @staticmethod
+    def _claim_batch():
+        return CLAIM_SCRIPT(keys=[PENDING_KEY, ResultWriter._processing_key()], args=[Config.RESULT_BATCH_SIZE])
+
+    @staticmethod
+    def store(rows):
+        """Synchronous insert plus the Redis-side aggregates; used by the flusher and the direct path."""
+        RankingService.apply_deltas(QuizRepository.save_results_batch(rows))
+        QuizStatsService.record(rows)
+
+    @staticmethod
+    def _is_stored(row):
+        return bool(row.get("attempt_id")) and QuizRepository.get_result_by_attempt_id(row["attempt_id"]) is not None
+
+    @staticmethod
+    def _insert(entries, row_by_row=False):
+        """
+        Stores (raw, row) entries; returns the (raw, error) ones that can't be stored.
+        Row by row, any error except a lost DB connection only fails its own row.
+        """
+        if not row_by_row:
+            try:
+                ResultWriter.store([row for _, row in entries])
+                return []
+            except IntegrityError:
+                # A re-queued attempt was stored already, or a row conflicts; find which
+                db.session.rollback()
+
+        failed = []
+        for raw, row in entries:
+            try:
+                ResultWriter.store([row])
+            except IntegrityError as e:
+                db.session.rollback()
+                if ResultWriter._is_stored(row):
+                    print("RESULT WRITER: duplicate attempt skipped:", row.get("attempt_id"))
+                else:
+                    failed.append((raw, e))
+            except OperationalError:
+                raise
+            except Exception as e:
+                if not row_by_row:
+                    raise
+                db.session.rollback()
+                failed.append((raw, e))
+        return failed
+
+    @staticmethod
+    def flush():
+        """Writes whatever this process has claimed (or claims now). Returns rows written."""
+        global _failed_flushes
+        processing_key = ResultWriter._processing_key()
+        items = cache.lrange(processing_key, 0, -1) or ResultWriter._claim_batch()
+        if not items:
+            return 0
+
+        entries, failed = [], []
+        for raw in items:
+            try:
+                entries.append((raw, ResultWriter._decode(raw)))
+            except (ValueError, TypeError) as e:
+                failed.append((raw, e))
+
+        try:
+            failed += ResultWriter._insert(entries, row_by_row=_failed_flushes >= Config.RESULT_MAX_RETRIES)
+        except Exception:
+            _failed_flushes += 1
+            raise
+        _failed_flushes = 0
+
+        pipe = cache.pipeline()
+        for raw, error in failed:
+            print("RESULT WRITER: row moved to dead letters:", error, raw)
+            pipe.rpush(DEAD_LETTER_KEY, json.dumps({"row": raw, "error": str(error), "failed_at": time.time()}))
+        pipe.delete(processing_key)
+        pipe.execute()
+        return len(items)
+
+    @staticmethod
+    def requeue_dead_letters():
+        """Puts dead-lettered rows back into the queue. Returns how many."""
+        moved = 0
+        while True:
+            entry = cache.lpop(DEAD_LETTER_KEY)
+            if entry is None:
+                return moved
+            cache.rpush(PENDING_KEY, json.loads(entry)["row"])
+            moved += 1
+
+    @staticmethod
+    def recover_orphans():
+        """Re-queues rows claimed by writers that stopped heartbeating."""
+        for key in cache.scan_iter(f"{PROCESSING_KEY_PREFIX}*"):
+            owner = key[len(PROCESSING_KEY_PREFIX):]
+            if owner == _worker_id or cache.exists(f"{ALIVE_KEY_PREFIX}{owner}"):
+                continue
+            moved = 0
+            while cache.lmove(key, PENDING_KEY, "LEFT", "RIGHT") is not None:
+                moved += 1
+            if moved:
+                print(f"RESULT WRITER: re-queued {moved} row(s) from {owner}")
+
+    @staticmethod
+    def _run(app):
+        interval = Config.RESULT_FLUSH_INTERVAL_MS / 1000
+        last_recovery = 0.0
+        with app.app_context():
+            while True:
+                try:
+                    cache.set(f"{ALIVE_KEY_PREFIX}{_worker_id}", 1, ex=ALIVE_TTL_SECONDS)
+                    if time.monotonic() - last_recovery > RECOVER_EVERY_SECONDS:
+                        ResultWriter.recover_orphans()
+                        last_recovery = time.monotonic()
+                    written = ResultWriter.flush()
+                except Exception as e:
+                    db.session.rollback()
+                    print("RESULT WRITER ERROR:", e)
+                    written = 0
+                finally:
+                    db.session.remove()
+                # Full batch -> more is probably waiting, keep draining; back off while failing
+                if _failed_flushes:
+                    socketio.sleep(min(interval * 2 ** _failed_flushes, MAX_BACKOFF_SECONDS))
+                elif written < Config.RESULT_BATCH_SIZE:
+                    socketio.sleep(interval)
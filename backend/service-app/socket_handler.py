@@ -2,6 +2,8 @@
 from flask import request
 from flask_jwt_extended import decode_token
 from extensions import socketio
+from utils.token_revocation import is_token_revoked
+from utils.role_version import is_role_stale
 
 @socketio.on('connect', namespace='/admin')
 def on_connect():
@@ -10,6 +12,9 @@ def on_connect():
         return False
     try:
         decoded = decode_token(token)
+        # decode_token doesn't consult the blocklist loader
+        if is_token_revoked(decoded.get("jti")) or is_role_stale(decoded):
+            return False
         if decoded.get("role") != "ADMIN":
             return False
         print(f"Admin connected: {decoded.get('sub')}")
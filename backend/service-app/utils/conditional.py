@@ -0,0 +1,38 @@
+import hashlib
+from datetime import timezone
+from flask import Response, request
+
+# Validators for conditional GETs. Routes compute them from cheap columns/aggregates, answer
+# 304 if they match, and only then load and serialize the full body.
+
+
+def make_etag(*parts):
+    return hashlib.sha1("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()[:32]
+
+
+def _utc(dt):
+    # DB2 stores naive UTC datetimes
+    return dt.replace(tzinfo=timezone.utc) if dt is not None and dt.tzinfo is None else dt
+
+
+def not_modified(etag, last_modified=None):
+    """304 response if the client's copy is current, else None. If-None-Match wins over If-Modified-Since."""
+    if request.if_none_match:
+        # Weak comparison: compressed responses carry the validator as W/"..."
+        fresh = request.if_none_match.contains_weak(etag)
+    elif last_modified is not None and request.if_modified_since is not None:
+        fresh = _utc(last_modified).replace(microsecond=0) <= request.if_modified_since
+    else:
+        fresh = False
+    if not fresh:
+        return None
+    return with_validators(Response(status=304), etag, last_modified)
+
+
+def with_validators(response, etag, last_modified=None):
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = _utc(last_modified)
+    # Responses depend on the caller's cookie; browsers may keep them but must revalidate
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
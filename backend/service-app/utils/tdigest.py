@@ -0,0 +1,109 @@
+import base64
+import math
+import struct
+
+_HEADER = struct.Struct("<dddI")
+_CENTROID = struct.Struct("<dd")
+
+
+class TDigest:
+    """
+    Merging t-digest (Dunning & Ertl) for streaming quantiles.
+
+    Keeps at most ~`compression` centroids (mean, weight); centroids near the tails stay
+    small, so extreme percentiles are more accurate than the median. Digests merge, which
+    is how buffered values are folded in, and serialize to a few KB (`to_text`).
+    """
+
+    def __init__(self, compression=100, centroids=None, minimum=math.inf, maximum=-math.inf):
+        self.compression = compression
+        self.centroids = centroids or []
+        self.count = sum(weight for _, weight in self.centroids)
+        self.min = minimum
+        self.max = maximum
+
+    # k1 scale function and its inverse: one unit of k is the most a centroid may span
+    def _k(self, q):
+        return self.compression / (2 * math.pi) * math.asin(2 * q - 1)
+
+    def _q(self, k):
+        return (math.sin(min(k * 2 * math.pi / self.compression, math.pi / 2)) + 1) / 2
+
+    def update(self, values):
+        values = [float(v) for v in values]
+        if not values:
+            return self
+        self.min = min(self.min, min(values))
+        self.max = max(self.max, max(values))
+        self._compress(self.centroids + [(v, 1.0) for v in values])
+        return self
+
+    def merge(self, other):
+        if other.count:
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self._compress(self.centroids + other.centroids)
+        return self
+
+    def _compress(self, points):
+        points.sort(key=lambda c: c[0])
+        total = sum(weight for _, weight in points)
+        merged = []
+        so_far = 0.0
+        q_limit = self._q(self._k(0) + 1)
+        mean, weight = points[0]
+        for next_mean, next_weight in points[1:]:
+            if (so_far + weight + next_weight) / total <= q_limit:
+                weight += next_weight
+                mean += (next_mean - mean) * next_weight / weight
+            else:
+                merged.append((mean, weight))
+                so_far += weight
+                q_limit = self._q(self._k(so_far / total) + 1)
+                mean, weight = next_mean, next_weight
+        merged.append((mean, weight))
+        self.centroids = merged
+        self.count = total
+
+    def quantile(self, q):
+        """Estimated value at quantile q (0..1), or None for an empty digest."""
+        if not self.centroids:
+            return None
+        if len(self.centroids) == 1:
+            return self.centroids[0][0]
+
+        # Interpolate between centroid centers; the ends interpolate towards min/max
+        index = q * self.count
+        cumulative = 0.0
+        prev_mean, prev_center = self.min, 0.0
+        for mean, weight in self.centroids:
+            center = cumulative + weight / 2
+            if index <= center:
+                if center == prev_center:
+                    return mean
+                return prev_mean + (index - prev_center) * (mean - prev_mean) / (center - prev_center)
+            cumulative += weight
+            prev_mean, prev_center = mean, center
+        if self.count == prev_center:
+            return self.max
+        return prev_mean + (index - prev_center) * (self.max - prev_mean) / (self.count - prev_center)
+
+    # --- serialization ---
+    def to_bytes(self):
+        parts = [_HEADER.pack(self.compression, self.min, self.max, len(self.centroids))]
+        parts.extend(_CENTROID.pack(mean, weight) for mean, weight in self.centroids)
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        compression, minimum, maximum, n = _HEADER.unpack_from(data)
+        centroids = [_CENTROID.unpack_from(data, _HEADER.size + i * _CENTROID.size) for i in range(n)]
+        return cls(compression, centroids, minimum, maximum)
+
+    def to_text(self):
+        """Base64 form, for stores that only hold strings (decode_responses Redis clients)."""
+        return base64.b64encode(self.to_bytes()).decode("ascii")
+
+    @classmethod
+    def from_text(cls, text, compression=100):
+        return cls.from_bytes(base64.b64decode(text)) if text else cls(compression)
@@ -14,6 +14,9 @@ type CreateQuestionResponseDTO = { question_id: number };
 type CreateAnswerDTO = { text: string; is_correct: boolean };
 type CreateAnswerResponseDTO = { answer_id: number };
 
+type BulkQuestionDTO = CreateQuestionDTO & { answers: CreateAnswerDTO[] };
+type BulkQuestionsResponseDTO = { questions: Array<{ question_id: number; answer_ids: number[] }> };
+
 type SubmitQuizResponseDTO = {
   id: number | string;
   status: "PENDING";
@@ -83,13 +86,17 @@ export async function addAnswer(questionId: number, dto: CreateAnswerDTO) {
   return quizHttp.post<CreateAnswerResponseDTO>(`/api/questions/${questionId}/answers`, dto);
 }
 
+export async function addQuestionsBulk(quizId: number | string, questions: BulkQuestionDTO[]) {
+  return quizHttp.post<BulkQuestionsResponseDTO>(`/api/quizzes/${quizId}/questions/bulk`, { questions });
+}
+
 export async function submitQuiz(quizId: number | string) {
   return quizHttp.post<SubmitQuizResponseDTO>(`/api/quizzes/${quizId}/submit`);
 }
 
 /**
  * Kreira kviz kompletno + šalje na submit (PENDING).
- * Sekvencijalno je namerno (najmanje edge-caseova).
+ * Pitanja i odgovori idu jednim bulk zahtevom (jedna transakcija).
  */
 export async function createAndSubmitFullQuiz(
   draft: QuizDraft,
@@ -104,28 +111,18 @@ export async function createAndSubmitFullQuiz(
 
   const questions: any[] = (draft as any).questions;
 
-  for (let qi = 0; qi < questions.length; qi++) {
-    const q = questions[qi];
-    onProgress?.({ step: "ADD_QUESTION", index: qi + 1, total: questions.length });
-
-    const qRes = await addQuestion(quizId, {
+  onProgress?.({ step: "ADD_QUESTION", index: questions.length, total: questions.length });
+  await addQuestionsBulk(
+    quizId,
+    questions.map((q) => ({
       text: pickQuestionText(q),
       points: Number(q.points),
-    });
-
-    const questionId = qRes.question_id;
-    const answers: any[] = q.answers;
-
-    for (let ai = 0; ai < answers.length; ai++) {
-      const a = answers[ai];
-      onProgress?.({ step: "ADD_ANSWER", qIndex: qi + 1, aIndex: ai + 1 });
-
-      await addAnswer(questionId, {
+      answers: (q.answers as any[]).map((a) => ({
         text: pickAnswerText(a),
         is_correct: pickAnswerCorrect(a),
-      });
-    }
-  }
+      })),
+    }))
+  );
 
   onProgress?.({ step: "SUBMIT" });
   const submitRes = await submitQuiz(quizId);
@@ -9,8 +9,16 @@ type UserRow = {
   role: string; // ADMIN | MODERATOR | PLAYER
 };
 
+type UserPage = {
+  items: UserRow[];
+  next_cursor: number | null;
+  total_estimate: number;
+};
+
 type UserUiRow = UserRow & { apiRole: Role };
 
+const PAGE_SIZE = 100;
+
 function normalizeApiRole(roleFromApi: string): Role {
   const r = (roleFromApi ?? "").toUpperCase();
   if (r === "ADMIN") return "ADMIN";
@@ -28,26 +36,31 @@ export default function UsersAdmin() {
   const [savingId, setSavingId] = useState<number | null>(null);
   const [deletingId, setDeletingId] = useState<number | null>(null);
   const [error, setError] = useState<string | null>(null);
+  const [nextCursor, setNextCursor] = useState<number | null>(null);
+  const [total, setTotal] = useState<number | null>(null);
 
-  async function loadUsers() {
+  // after = null -> prva strana (refresh), inače dodaje sledeću stranu
+  async function loadUsers(after: number | null = null) {
     setLoading(true);
     setError(null);
 
     try {
-      const data = await authHttp.get<UserRow[]>("/api/users/");
+      const query = `?limit=${PAGE_SIZE}` + (after !== null ? `&after=${after}` : "");
+      const data = await authHttp.get<UserPage>(`/api/users/${query}`);
 
-      if (!Array.isArray(data)) {
+      if (!data || !Array.isArray(data.items)) {
         throw new Error("API nije vratio listu (array).");
       }
 
-      setUsers(
-        data.map((u) => ({
-          ...u,
-          apiRole: normalizeApiRole(u.role),
-        }))
-      );
+      const rows = data.items.map((u) => ({
+        ...u,
+        apiRole: normalizeApiRole(u.role),
+      }));
+      setUsers((prev) => (after !== null ? [...prev, ...rows] : rows));
+      setNextCursor(data.next_cursor);
+      setTotal(data.total_estimate);
     } catch (e: any) {
-      setUsers([]);
+      if (after === null) setUsers([]);
       setError(
         `Greška pri učitavanju korisnika.\nStatus=${e?.status ?? "?"}\n` +
         (e?.data
@@ -118,18 +131,19 @@ export default function UsersAdmin() {
       <h2>Admin – Lista korisnika</h2>
 
       <div style={{ marginBottom: 12 }}>
-        <button onClick={loadUsers} disabled={loading}>
+        <button onClick={() => loadUsers()} disabled={loading}>
           {loading ? "Učitavanje..." : "Refresh"}
         </button>
+        {total !== null && <span style={{ marginLeft: 12 }}>Ukupno: ~{total}</span>}
       </div>
 
       {error && <pre style={{ color: "crimson", whiteSpace: "pre-wrap" }}>{error}</pre>}
 
-      {loading && <p>Učitavanje...</p>}
+      {loading && users.length === 0 && <p>Učitavanje...</p>}
 
       {!loading && !error && users.length === 0 && <p>Nema korisnika.</p>}
 
-      {!loading && users.length > 0 && (
+      {users.length > 0 && (
         <table style={{ width: "100%", borderCollapse: "collapse" }}>
           <thead>
             <tr>
@@ -202,6 +216,14 @@ export default function UsersAdmin() {
           </tbody>
         </table>
       )}
+
+      {nextCursor !== null && (
+        <div style={{ marginTop: 12 }}>
+          <button onClick={() => loadUsers(nextCursor)} disabled={loading}>
+            {loading ? "Učitavanje..." : "Učitaj još"}
+          </button>
+        </div>
+      )}
     </div>
   );
 }
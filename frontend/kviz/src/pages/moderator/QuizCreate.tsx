@@ -18,8 +18,7 @@ type CreateQuizResponseDTO = {
   status: "DRAFT" | "PENDING" | "APPROVED" | "REJECTED";
 };
 
-type CreateQuestionResponseDTO = { question_id: number };
-type CreateAnswerResponseDTO = { answer_id: number };
+type BulkQuestionsResponseDTO = { questions: Array<{ question_id: number; answer_ids: number[] }> };
 type SubmitQuizResponseDTO = { id: number | string; status: "PENDING" };
 
 function normalizeRole(r?: string) {
@@ -169,31 +168,17 @@ export default function QuizCreate() {
 
       const quizId = quizRes.id;
 
-      // 2) Add questions + answers
+      // 2) Add questions + answers (one request, one transaction)
       const questions: any[] = (draft as any).questions;
-
-      for (let qi = 0; qi < questions.length; qi++) {
-        const q = questions[qi];
-        setProgress(`Dodajem pitanje ${qi + 1}/${questions.length}...`);
-
-        const qRes = await quizHttp.post<CreateQuestionResponseDTO>(
-          `/api/quizzes/${quizId}/questions`,
-          { text: qText(q), points: Number(q.points) }
-        );
-
-        const questionId = qRes.question_id;
-        const answers: any[] = q.answers;
-
-        for (let ai = 0; ai < answers.length; ai++) {
-          const a = answers[ai];
-          setProgress(`Dodajem odgovore (p${qi + 1}, o${ai + 1}/${answers.length})...`);
-
-          await quizHttp.post<CreateAnswerResponseDTO>(`/api/questions/${questionId}/answers`, {
-            text: aText(a),
-            is_correct: aIsCorrect(a),
-          });
-        }
-      }
+      setProgress(`Dodajem pitanja (${questions.length})...`);
+
+      await quizHttp.post<BulkQuestionsResponseDTO>(`/api/quizzes/${quizId}/questions/bulk`, {
+        questions: questions.map((q) => ({
+          text: qText(q),
+          points: Number(q.points),
+          answers: (q.answers as any[]).map((a) => ({ text: aText(a), is_correct: aIsCorrect(a) })),
+        })),
+      });
 
       // 3) Submit quiz -> PENDING
       setProgress("Šaljem kviz na odobrenje (PENDING)...");
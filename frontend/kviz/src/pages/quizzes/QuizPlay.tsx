@@ -20,6 +20,15 @@ interface QuizData {
   }>;
 }
 
+interface AttemptSession {
+  attempt_id: string;
+  deadline: number;
+  server_time: number;
+  answers?: Array<{ question_id: number; answer_ids: number[] }>;
+}
+
+const AUTOSAVE_DELAY_MS = 800;
+
 // --- HELPERS ---
 
 function formatTime(seconds: number) {
@@ -50,6 +59,10 @@ export default function QuizPlay() {
   const [confirmExitOpen, setConfirmExitOpen] = useState(false);
 
   const didAutoSubmitRef = useRef(false);
+  // Issued by /start; reused when the submit is retried, so the server scores this attempt only once
+  const attemptIdRef = useRef<string>(uid());
+  // Only user changes are autosaved, not the state restored from the server
+  const answersDirtyRef = useRef(false);
   const dangerTime = timeLeft <= 10 && timeLeft > 0;
 
   // 1. Fetch Quiz Data
@@ -59,17 +72,46 @@ export default function QuizPlay() {
       try {
         setLoading(true);
 
-        // Using explicit VITE_API_SERVICE_URL
-        const response = await fetch(`${API_BASE}/api/quizzes/${id}/full`, {
+        // Player view compiled on approval (no correct answers); revalidated by ETag
+        const response = await fetch(`${API_BASE}/api/quizzes/${id}/play`, {
           credentials: "include"
         });
 
         if (!response.ok) throw new Error(`Greška: ${response.status}`);
 
         const data: QuizData = await response.json();
+
+        // Resume an attempt that is still open (reload/crash), otherwise start a new one.
+        // Server keeps the clock: elapsed time and the deadline are enforced on /process
+        let session: AttemptSession | null = null;
+        const openAttemptId = localStorage.getItem(`quiz-attempt:${id}`);
+        if (openAttemptId) {
+          const resumeResponse = await fetch(`${API_BASE}/api/attempts/${openAttemptId}/answers`, {
+            credentials: "include"
+          });
+          if (resumeResponse.ok) {
+            const resumed: AttemptSession = await resumeResponse.json();
+            if (resumed.deadline > resumed.server_time) session = resumed;
+          }
+        }
+        if (!session) {
+          const startResponse = await fetch(`${API_BASE}/api/quizzes/${id}/start`, {
+            method: "POST",
+            credentials: "include"
+          });
+          if (!startResponse.ok) throw new Error(`Greška: ${startResponse.status}`);
+          session = (await startResponse.json()) as AttemptSession;
+          localStorage.setItem(`quiz-attempt:${id}`, session.attempt_id);
+        }
+        attemptIdRef.current = session.attempt_id;
+
+        const restored: AnswerState = {};
+        for (const item of session.answers ?? []) restored[item.question_id] = item.answer_ids;
+
         setQuiz(data);
-        setTimeLeft(data.duration_seconds);
-        setAnswers({});
+        setTimeLeft(Math.max(0, Math.floor(session.deadline - session.server_time)));
+        setAnswers(restored);
+        answersDirtyRef.current = false;
         didAutoSubmitRef.current = false;
       } catch (err: any) {
         console.error("Fetch error:", err);
@@ -81,6 +123,25 @@ export default function QuizPlay() {
     fetchQuiz();
   }, [id, toast, API_BASE]);
 
+  // Autosave: the whole selection, debounced; kept in Redis until the final submit
+  useEffect(() => {
+    if (!quiz || submitting || !answersDirtyRef.current) return;
+
+    const t = setTimeout(() => {
+      const payload = Object.entries(answers).map(([qId, aIds]) => ({
+        question_id: parseInt(qId),
+        answer_ids: aIds
+      }));
+      fetch(`${API_BASE}/api/attempts/${attemptIdRef.current}/answers`, {
+        method: "PUT",
+        headers: { "Content-Type": "application/json" },
+        credentials: "include",
+        body: JSON.stringify({ answers: payload })
+      }).catch((err) => console.warn("Autosave failed:", err));
+    }, AUTOSAVE_DELAY_MS);
+    return () => clearTimeout(t);
+  }, [answers, quiz, submitting, API_BASE]);
+
   // 2. Submit Logic
   const submit = async (auto = false) => {
     if (!quiz || submitting) return;
@@ -105,6 +166,7 @@ export default function QuizPlay() {
         headers: { "Content-Type": "application/json" },
         credentials: "include",
         body: JSON.stringify({
+          attempt_id: attemptIdRef.current,
           time_spent_seconds: Math.max(0, quiz.duration_seconds - timeLeft),
           answers: formattedAnswers
         }),
@@ -116,7 +178,8 @@ export default function QuizPlay() {
       }
 
       const result = await response.json();
-      const attemptId = uid();
+      const attemptId = attemptIdRef.current;
+      localStorage.removeItem(`quiz-attempt:${quiz.id}`);
 
       localStorage.setItem(`attempt:${attemptId}`, JSON.stringify({
         ...result,
@@ -159,6 +222,7 @@ export default function QuizPlay() {
   }, [answers, quiz]);
 
   function toggleAnswer(questionId: number, answerId: number) {
+    answersDirtyRef.current = true;
     setAnswers((prev) => {
       const currentSelected = prev[questionId] ?? [];
       const isAlreadySelected = currentSelected.includes(answerId);